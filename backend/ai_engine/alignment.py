@@ -0,0 +1,132 @@
+"""
+Target-vs-spoken alignment for read-aloud topics.
+
+Words are interned to integer IDs and each target text is tokenized once and
+cached. Spoken words that never occur in the target can't match anything and
+are dropped before diffing, so off-topic speech costs almost nothing. The
+remaining integer sequences are diffed with Myers' linear-space O(ND)
+algorithm, which is fast when the speaker mostly follows the script
+(small D) and needs no quadratic table for multi-minute texts.
+"""
+import os
+import string
+import threading
+from typing import Dict, List
+from cache import LRUCache
+
+_vocab: Dict[str, int] = {}
+_vocab_lock = threading.Lock()
+
+_PUNCTUATION = string.punctuation + "“”‘’—–…"
+
+# Tokenized target texts, keyed by the text itself so edited topics miss
+_targets = LRUCache(maxsize=int(os.getenv("ALIGNMENT_TARGET_CACHE_SIZE", "256")))
+
+def _normalize(word: str) -> str:
+    return word.lower().strip(_PUNCTUATION)
+
+def _intern(word: str) -> int:
+    word_id = _vocab.get(word)
+    if word_id is None:
+        with _vocab_lock:
+            word_id = _vocab.setdefault(word, len(_vocab))
+    return word_id
+
+def tokenize_target(text: str):
+    """Returns (display words, interned IDs) for a target text, cached."""
+    cached = _targets.get(text)
+    if cached is None:
+        words = text.split()
+        cached = (words, [_intern(_normalize(w)) for w in words])
+        _targets.set(text, cached)
+    return cached
+
+def _middle_snake(a, a_lo, a_hi, b, b_lo, b_hi):
+    """
+    Finds the middle snake of the shortest edit script between
+    a[a_lo:a_hi] and b[b_lo:b_hi]. Returns (x, y, u, v): the diagonal run of
+    matches from (x, y) to (u, v), in absolute indices.
+    """
+    n, m = a_hi - a_lo, b_hi - b_lo
+    delta = n - m
+    odd = delta & 1
+    max_d = (n + m + 1) // 2
+    offset = max_d + 1
+    forward = [0] * (2 * max_d + 3)
+    backward = [0] * (2 * max_d + 3)
+    for d in range(max_d + 1):
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and forward[offset + k - 1] < forward[offset + k + 1]):
+                x = forward[offset + k + 1]
+            else:
+                x = forward[offset + k - 1] + 1
+            y = x - k
+            x0, y0 = x, y
+            while x < n and y < m and a[a_lo + x] == b[b_lo + y]:
+                x += 1
+                y += 1
+            forward[offset + k] = x
+            if odd and -(d - 1) <= delta - k <= d - 1 and x + backward[offset + delta - k] >= n:
+                return a_lo + x0, b_lo + y0, a_lo + x, b_lo + y
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and backward[offset + k - 1] < backward[offset + k + 1]):
+                x = backward[offset + k + 1]
+            else:
+                x = backward[offset + k - 1] + 1
+            y = x - k
+            x0, y0 = x, y
+            while x < n and y < m and a[a_hi - 1 - x] == b[b_hi - 1 - y]:
+                x += 1
+                y += 1
+            backward[offset + k] = x
+            if not odd and -d <= delta - k <= d and x + forward[offset + delta - k] >= n:
+                return a_hi - x, b_hi - y, a_hi - x0, b_hi - y0
+    raise AssertionError("middle snake not found")
+
+def _mark_matches(a, b, matched: bytearray):
+    """Marks matched[i] for every a[i] on a longest common subsequence with b."""
+    stack = [(0, len(a), 0, len(b))]
+    while stack:
+        a_lo, a_hi, b_lo, b_hi = stack.pop()
+        while a_lo < a_hi and b_lo < b_hi and a[a_lo] == b[b_lo]:
+            matched[a_lo] = 1
+            a_lo += 1
+            b_lo += 1
+        while a_lo < a_hi and b_lo < b_hi and a[a_hi - 1] == b[b_hi - 1]:
+            matched[a_hi - 1] = 1
+            a_hi -= 1
+            b_hi -= 1
+        if a_lo == a_hi or b_lo == b_hi:
+            continue
+        x, y, u, v = _middle_snake(a, a_lo, a_hi, b, b_lo, b_hi)
+        for i in range(x, u):
+            matched[i] = 1
+        stack.append((a_lo, x, b_lo, y))
+        stack.append((u, a_hi, v, b_hi))
+
+def align_to_target(target_text: str, transcript: str) -> List[dict]:
+    """
+    Aligns the transcript against the target text and returns consecutive
+    target segments tagged "matched" (spoken) or "missed".
+    """
+    if not target_text:
+        return []
+    target_words, target_ids = tokenize_target(target_text)
+    # Only intern target words; unknown spoken words can never match
+    spoken_ids = [_vocab.get(_normalize(w)) for w in (transcript or "").split()]
+    target_set = set(target_ids)
+    spoken_ids = [i for i in spoken_ids if i in target_set]
+
+    matched = bytearray(len(target_ids))
+    _mark_matches(target_ids, spoken_ids, matched)
+
+    segments = []
+    start = 0
+    for i in range(1, len(target_words) + 1):
+        if i == len(target_words) or matched[i] != matched[start]:
+            segments.append({
+                "status": "matched" if matched[start] else "missed",
+                "text": " ".join(target_words[start:i])
+            })
+            start = i
+    return segments
@@ -1,31 +1,147 @@
+import os
 import librosa
 import numpy as np
- 
-def analyze_audio_features(file_path: str):
+import scipy.signal
+
+# Every recording is decoded once, mono, at this rate and all features are
+# derived from one shared magnitude spectrogram.
+ANALYSIS_SR = int(os.getenv("ANALYSIS_SAMPLE_RATE", "16000"))
+N_FFT = 1024
+HOP_LENGTH = 256
+MAX_DECODE_SECONDS = float(os.getenv("MAX_AUDIO_SECONDS", "600"))
+
+# Mean RMS below this is treated as "no speech"
+SILENCE_THRESHOLD = 0.005
+
+# RMS computed from a Hann-windowed STFT is attenuated by the window energy;
+# dividing by this keeps it on the same scale as librosa.feature.rms(y=y),
+# which the silence threshold in the pipeline was tuned against.
+_WINDOW_RMS = float(np.sqrt(np.mean(scipy.signal.get_window("hann", N_FFT) ** 2)))
+
+class SpectralFrame:
+    """
+    Shared analysis buffer for one recording: the decoded signal and its
+    magnitude spectrogram, plus lazily derived intermediates (mel, onset).
     """
-    Analyzes audio file for duration, tempo, and pitch.
-    Returns a dictionary of metrics.
+    def __init__(self, y: np.ndarray, sr: int):
+        self.y = y
+        self.sr = sr
+        self.hop_length = HOP_LENGTH
+        self.S = np.abs(librosa.stft(y, n_fft=N_FFT, hop_length=HOP_LENGTH))
+        self._cache = {}
+
+    def cached(self, name, fn):
+        if name not in self._cache:
+            self._cache[name] = fn()
+        return self._cache[name]
+
+    @property
+    def mel_db(self):
+        return self.cached("mel_db", lambda: librosa.power_to_db(
+            librosa.feature.melspectrogram(S=self.S ** 2, sr=self.sr)
+        ))
+
+    @property
+    def onset_envelope(self):
+        return self.cached("onset_envelope", lambda: librosa.onset.onset_strength(
+            S=self.mel_db, sr=self.sr, hop_length=self.hop_length
+        ))
+
+# Frame-level feature extractors, all reading from the shared SpectralFrame.
+# New features register here instead of recomputing their own STFT.
+FRAME_FEATURES = {}
+
+def frame_feature(name):
+    def register(fn):
+        FRAME_FEATURES[name] = fn
+        return fn
+    return register
+
+@frame_feature("centroid")
+def _centroid(frame: SpectralFrame):
+    return librosa.feature.spectral_centroid(S=frame.S, sr=frame.sr, n_fft=N_FFT)[0]
+
+@frame_feature("rms")
+def _rms(frame: SpectralFrame):
+    return librosa.feature.rms(S=frame.S, frame_length=N_FFT)[0] / _WINDOW_RMS
+
+@frame_feature("onset_envelope")
+def _onset_envelope(frame: SpectralFrame):
+    return frame.onset_envelope
+
+def has_audible_energy(file_path: str, threshold: float = SILENCE_THRESHOLD, window_seconds: float = 0.064):
+    """
+    Streams decoded PCM blocks and stops at the first short window whose RMS
+    reaches the threshold. If no window does, the recording's mean RMS can't
+    either, so it is silent without ever building a spectrogram.
+    Returns (audible, seconds_scanned). Errs on the side of "audible" when the
+    file can't be streamed, leaving the decision to the full analysis.
     """
     try:
-        y, sr = librosa.load(file_path, sr=None)
-        duration = librosa.get_duration(y=y, sr=sr)
-        tempo, _ = librosa.beat.beat_track(y=y, sr=sr)
-        
+        import audioread
+        with audioread.audio_open(file_path) as f:
+            window = max(1, int(f.samplerate * window_seconds)) * f.channels
+            pending = np.zeros(0, dtype=np.float32)
+            scanned = 0
+            for block in f:
+                samples = np.frombuffer(block, dtype="<i2").astype(np.float32) / 32768.0
+                scanned += len(samples)
+                pending = np.concatenate([pending, samples])
+                n = len(pending) // window
+                if n:
+                    windows = pending[:n * window].reshape(n, window)
+                    if np.sqrt(np.mean(windows ** 2, axis=1)).max() >= threshold:
+                        return True, scanned / (f.samplerate * f.channels)
+                    pending = pending[n * window:]
+            if len(pending) and np.sqrt(np.mean(pending ** 2)) >= threshold:
+                return True, scanned / (f.samplerate * f.channels)
+            return False, scanned / (f.samplerate * f.channels)
+    except Exception as e:
+        print(f"Energy pre-pass skipped: {e}")
+        return True, 0.0
+
+def load_audio(file_path: str):
+    """Decodes the file once, mono, at the fixed analysis rate."""
+    y, sr = librosa.load(file_path, sr=ANALYSIS_SR, mono=True, duration=MAX_DECODE_SECONDS)
+    return y, sr
+
+def extract_features(y: np.ndarray, sr: int):
+    """
+    Computes summary metrics and frame-level arrays from a decoded signal.
+    """
+    duration = librosa.get_duration(y=y, sr=sr)
+    if len(y) == 0:
+        frames = {name: np.zeros(0) for name in FRAME_FEATURES}
+        tempo = 0.0
+    else:
+        frame = SpectralFrame(y, sr)
+        frames = {name: fn(frame) for name, fn in FRAME_FEATURES.items()}
+        tempo, _ = librosa.beat.beat_track(
+            onset_envelope=frame.onset_envelope, sr=sr, hop_length=frame.hop_length
+        )
+
+    return {
+        "duration": duration,
+        "tempo": float(np.atleast_1d(tempo)[0]),
         # Pitch analysis (Spectral Centroid as a proxy for brightness/pitch)
-        spectral_centroids = librosa.feature.spectral_centroid(y=y, sr=sr)[0]
-        avg_pitch = float(np.mean(spectral_centroids))
-        
+        "avg_pitch": float(np.mean(frames["centroid"])) if len(frames["centroid"]) else 0.0,
         # Volume analysis (RMS)
-        rms = librosa.feature.rms(y=y)[0]
-        avg_volume = float(np.mean(rms))
-        
-        return {
-            "duration": duration,
-            "tempo": float(tempo),
-            "avg_pitch": avg_pitch,
-            "avg_volume": avg_volume,
-            "success": True
-        }
+        "avg_volume": float(np.mean(frames["rms"])) if len(frames["rms"]) else 0.0,
+        "frames": frames,
+        "sr": sr,
+        "hop_length": HOP_LENGTH,
+        "success": True
+    }
+
+def analyze_audio_features(file_path: str):
+    """
+    Analyzes audio file for duration, tempo, pitch and volume.
+    Returns a dictionary of summary metrics plus the frame-level arrays
+    they were computed from (under "frames").
+    """
+    try:
+        y, sr = load_audio(file_path)
+        return extract_features(y, sr)
     except Exception as e:
         print(f"Audio analysis error: {e}")
         return {
@@ -33,6 +149,7 @@ def analyze_audio_features(file_path: str):
             "tempo": 0.0,
             "avg_pitch": 0.0,
             "avg_volume": 0.0,
+            "frames": {},
             "success": False,
             "error": str(e)
 
@@ -1,21 +1,18 @@
-from openai import OpenAI
+import os
+import re
+import copy
 import json
+import hashlib
+from cache import LRUCache
+from .openai_client import get_async_client, call_openai
 
-def generate_feedback(client: OpenAI, transcript: str, duration: float, wpm: float, filler_count: int, topic_description: str = ""):
-    """
-    Generates feedback using OpenAI GPT with topic relevance scoring.
-    """
-    if not client:
-        return {
-            "score": 0,
-            "filler_count": filler_count,
-            "tone": "Unknown",
-            "improvement_plan": ["Configure OpenAI API Key to get feedback."],
-            "metrics": {"clarity": 0, "confidence": 0},
-            "content_match_score": 0
-        }
+FEEDBACK_MODEL = "gpt-3.5-turbo-0125"
+
+# Bump whenever SYSTEM_PROMPT or the user prompt template below changes so
+# cached feedback produced by the old prompt is never served.
+FEEDBACK_PROMPT_VERSION = 1
 
-    system_prompt = """
+SYSTEM_PROMPT = """
     You are an expert communication coach. Analyze the user's speech transcript.
     
     CRITICAL: The score must be heavily weighted on whether the spoken content matches the expected topic.
@@ -31,7 +28,52 @@ def generate_feedback(client: OpenAI, transcript: str, duration: float, wpm: flo
     - improvement_plan: list of 2-3 specific, actionable tips (mention if content is off-topic)
     - metrics: object with 'clarity' (0-100) and 'confidence' (0-100)
     """
-    
+
+# Feedback for identical (normalized) inputs is reused instead of paying for
+# another chat completion: re-analysis, batch rescoring, demo scripts.
+feedback_cache = LRUCache(
+    maxsize=int(os.getenv("FEEDBACK_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("FEEDBACK_CACHE_TTL", str(24 * 3600)))
+)
+
+_PROMPT_FINGERPRINT = hashlib.sha256(SYSTEM_PROMPT.encode("utf-8")).hexdigest()[:16]
+
+def _normalize_text(text: str) -> str:
+    return re.sub(r"\s+", " ", (text or "").strip().lower())
+
+def feedback_cache_key(transcript: str, duration: float, wpm: float, filler_count: int, topic_description: str) -> str:
+    parts = [
+        str(FEEDBACK_PROMPT_VERSION),
+        _PROMPT_FINGERPRINT,
+        FEEDBACK_MODEL,
+        _normalize_text(transcript),
+        f"{duration:.1f}",
+        f"{wpm:.1f}",
+        str(filler_count),
+        _normalize_text(topic_description)
+    ]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+async def generate_feedback(transcript: str, duration: float, wpm: float, filler_count: int, topic_description: str = ""):
+    """
+    Generates feedback using OpenAI GPT with topic relevance scoring.
+    Successful responses are memoized in feedback_cache.
+    """
+    if not get_async_client():
+        return {
+            "score": 0,
+            "filler_count": filler_count,
+            "tone": "Unknown",
+            "improvement_plan": ["Configure OpenAI API Key to get feedback."],
+            "metrics": {"clarity": 0, "confidence": 0},
+            "content_match_score": 0
+        }
+
+    key = feedback_cache_key(transcript, duration, wpm, filler_count, topic_description)
+    cached = feedback_cache.get(key)
+    if cached is not None:
+        return copy.deepcopy(cached)
+
     user_prompt = f"""
     Expected Topic: "{topic_description}"
     
@@ -44,15 +86,17 @@ def generate_feedback(client: OpenAI, transcript: str, duration: float, wpm: flo
     """
     
     try:
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo-0125",
+        response = await call_openai(lambda client: client.chat.completions.create(
+            model=FEEDBACK_MODEL,
             response_format={"type": "json_object"},
             messages=[
-                {"role": "system", "content": system_prompt},
+                {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": user_prompt}
             ]
-        )
-        return json.loads(response.choices[0].message.content)
+        ))
+        feedback = json.loads(response.choices[0].message.content)
+        feedback_cache.set(key, copy.deepcopy(feedback))
+        return feedback
     except Exception as e:
         print(f"Feedback generation error: {e}")
         return {
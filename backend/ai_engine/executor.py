@@ -0,0 +1,83 @@
+import os
+import time
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from fastapi import HTTPException, status
+from dotenv import load_dotenv
+from .audio import analyze_audio_features
+
+load_dotenv()
+
+# CPU-bound audio work (decode + feature extraction) runs in a process pool so
+# the event loop stays free while recordings are analysed across cores.
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Jobs allowed to wait for a free worker before new requests are turned away.
+ANALYSIS_MAX_PENDING = int(os.getenv("ANALYSIS_MAX_PENDING", str(ANALYSIS_WORKERS * 4)))
+
+_pool = None
+_slots = None
+
+def _warm_up():
+    """
+    Runs once in each worker process: imports librosa and pushes a short
+    synthetic signal through the feature path so the first real request
+    doesn't pay for numba compilation and FFT planning.
+    """
+    import numpy as np
+    from .audio import extract_features, ANALYSIS_SR
+    t = np.arange(ANALYSIS_SR, dtype=np.float32) / ANALYSIS_SR
+    extract_features(0.1 * np.sin(2 * np.pi * 220 * t).astype(np.float32), ANALYSIS_SR)
+
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=ANALYSIS_WORKERS, initializer=_warm_up)
+    return _pool
+
+def _ping(delay: float):
+    # Holding the worker briefly lets the other warm workers take the rest
+    time.sleep(delay)
+    return os.getpid()
+
+def warm_pool():
+    """
+    Starts every worker process and waits until each has finished _warm_up.
+    ProcessPoolExecutor only spawns workers as tasks arrive, so creating the
+    pool alone would leave the warm-up to the first requests. Rounds of short
+    tasks go out until every worker has answered one; a worker only picks up
+    tasks once its initializer has returned.
+    """
+    pool = get_pool()
+    ready = set()
+    while len(ready) < ANALYSIS_WORKERS:
+        futures = [pool.submit(_ping, 0.05) for _ in range(ANALYSIS_WORKERS)]
+        ready.update(future.result() for future in futures)
+    return len(ready)
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+async def run_in_pool(fn, *args):
+    """
+    Runs fn(*args) in the analysis pool. At most ANALYSIS_WORKERS jobs run and
+    ANALYSIS_MAX_PENDING wait; anything beyond that gets a 503 right away
+    rather than queueing unboundedly.
+    """
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(ANALYSIS_WORKERS + ANALYSIS_MAX_PENDING)
+    if _slots.locked():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Analysis queue is full, please retry shortly"
+        )
+    async with _slots:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_pool(), fn, *args)
+
+async def analyze_audio_features_async(file_path: str):
+    """analyze_audio_features, off the event loop."""
+    return await run_in_pool(analyze_audio_features, file_path)
@@ -0,0 +1,94 @@
+"""
+Filler word detection.
+
+A lexicon of single- and multi-word fillers is compiled once into a token
+trie; detection tokenizes the transcript and makes a single left-to-right
+pass, taking the longest filler that starts at each token. Matching is on whole words, so "so" no longer matches inside
+"also" nor "like" inside "likely".
+"""
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Tuple
+
+LEXICONS = {
+    # Used by the main /analyze pipeline
+    "default": ["um", "uh", "like", "you know", "so", "actually", "basically", "literally"],
+    # Used by the legacy services/analysis.py path
+    "basic": ["um", "uh", "like", "you know"],
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)*")
+_END = "$"
+
+@dataclass
+class FillerReport:
+    total: int = 0
+    counts: Dict[str, int] = field(default_factory=dict)
+    # (filler, index of its first token in the transcript)
+    positions: List[Tuple[str, int]] = field(default_factory=list)
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall((text or "").lower())
+
+class FillerDetector:
+    def __init__(self, fillers: Iterable[str]):
+        self.fillers = []
+        self._trie = {}
+        for filler in fillers:
+            words = tokenize(filler)
+            if not words:
+                continue
+            phrase = " ".join(words)
+            node = self._trie
+            for word in words:
+                node = node.setdefault(word, {})
+            if _END not in node:
+                node[_END] = phrase
+                self.fillers.append(phrase)
+
+    def detect(self, text: str) -> FillerReport:
+        tokens = tokenize(text)
+        report = FillerReport(counts={filler: 0 for filler in self.fillers})
+        trie = self._trie
+        n = len(tokens)
+        # Only tokens that can start a filler need the trie walk
+        candidates = [i for i, token in enumerate(tokens) if token in trie]
+        resume = 0  # First token not consumed by the previous match
+        for i in candidates:
+            if i < resume:
+                continue
+            node = trie[tokens[i]]
+            match, match_len = node.get(_END), 1
+            j = i + 1
+            while j < n:
+                node = node.get(tokens[j])
+                if node is None:
+                    break
+                j += 1
+                if _END in node:
+                    match, match_len = node[_END], j - i
+            if match is None:
+                continue
+            report.counts[match] += 1
+            report.positions.append((match, i))
+            resume = i + match_len
+        report.total = len(report.positions)
+        return report
+
+_detectors = {}
+
+def get_detector(lexicon: str = "default") -> FillerDetector:
+    """
+    Compiled detector for a named lexicon. FILLER_WORDS (comma separated)
+    overrides the default lexicon.
+    """
+    if lexicon not in _detectors:
+        words = LEXICONS[lexicon]
+        if lexicon == "default" and os.getenv("FILLER_WORDS"):
+            words = [w.strip() for w in os.getenv("FILLER_WORDS").split(",") if w.strip()]
+        _detectors[lexicon] = FillerDetector(words)
+    return _detectors[lexicon]
+
+def detect_fillers(text: str, lexicon: str = "default") -> FillerReport:
+    return get_detector(lexicon).detect(text)
@@ -0,0 +1,89 @@
+"""
+Shared async OpenAI access for transcription and feedback.
+
+One pooled AsyncOpenAI client per event loop, a semaphore capping in-flight
+calls to what our API rate limit allows, per-call deadlines and jittered
+exponential backoff on 429 / 5xx / timeouts. A burst of uploads queues on the
+semaphore instead of hammering upstream.
+"""
+import os
+import random
+import asyncio
+import weakref
+from typing import Awaitable, Callable, Optional
+import httpx
+import openai
+from openai import AsyncOpenAI
+from dotenv import load_dotenv
+
+load_dotenv()
+
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_TIMEOUT_SECONDS = float(os.getenv("OPENAI_TIMEOUT_SECONDS", "60"))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "4"))
+OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "8"))
+OPENAI_BACKOFF_BASE = 0.5
+OPENAI_BACKOFF_CAP = 20.0
+
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.InternalServerError,
+    openai.APIConnectionError,  # Includes APITimeoutError
+    asyncio.TimeoutError,
+)
+
+# The httpx pool and the semaphore are bound to the loop they were created
+# on; the API and worker.py each run a single loop, but keying by loop keeps
+# scripts that call asyncio.run() repeatedly safe.
+_loop_state = weakref.WeakKeyDictionary()
+
+def _state():
+    loop = asyncio.get_running_loop()
+    state = _loop_state.get(loop)
+    if state is None:
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=OPENAI_MAX_CONCURRENCY * 2,
+                max_keepalive_connections=OPENAI_MAX_CONCURRENCY
+            ),
+            timeout=httpx.Timeout(OPENAI_TIMEOUT_SECONDS, connect=10.0)
+        )
+        client = AsyncOpenAI(api_key=OPENAI_API_KEY, http_client=http_client, max_retries=0)
+        state = (client, asyncio.Semaphore(OPENAI_MAX_CONCURRENCY))
+        _loop_state[loop] = state
+    return state
+
+def get_async_client() -> Optional[AsyncOpenAI]:
+    """The shared client for the running loop, or None when no API key is set."""
+    if not OPENAI_API_KEY:
+        return None
+    return _state()[0]
+
+def _backoff_delay(attempt: int, error: Exception) -> float:
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    if retry_after:
+        try:
+            return min(float(retry_after), OPENAI_BACKOFF_CAP)
+        except ValueError:
+            pass
+    # Full jitter so queued callers don't retry in lockstep
+    return random.uniform(0, min(OPENAI_BACKOFF_CAP, OPENAI_BACKOFF_BASE * 2 ** attempt))
+
+async def call_openai(call: Callable[[AsyncOpenAI], Awaitable], deadline: float = OPENAI_TIMEOUT_SECONDS):
+    """
+    Runs call(client) under the concurrency limit, cancelling it after
+    `deadline` seconds and retrying retryable failures with backoff.
+    `call` is invoked afresh for each attempt, so file uploads are reopened.
+    """
+    client, semaphore = _state()
+    for attempt in range(OPENAI_MAX_RETRIES + 1):
+        try:
+            async with semaphore:
+                return await asyncio.wait_for(call(client), timeout=deadline)
+        except RETRYABLE_ERRORS as e:
+            if attempt == OPENAI_MAX_RETRIES:
+                raise
+            delay = _backoff_delay(attempt, e)
+            print(f"OpenAI call failed ({type(e).__name__}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
@@ -0,0 +1,206 @@
+import os
+import hashlib
+import mimetypes
+import shutil
+import tempfile
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+from fastapi import UploadFile, HTTPException, status
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Permanent audio storage and the scratch area used while an upload is streamed.
+# The scratch directory lives inside the uploads directory so that promoting a
+# finished upload is a same-filesystem os.replace (atomic, no second copy).
+UPLOADS_DIR = os.getenv("UPLOADS_DIR", "uploads")
+SCRATCH_DIR = os.path.join(UPLOADS_DIR, ".incoming")
+# Recordings waiting for a background analysis worker
+JOBS_DIR = os.path.join(UPLOADS_DIR, ".jobs")
+# Optional colder (cheaper, slower) volume for older recordings. Archived
+# files keep their name, so Attempt.audio_url doesn't change when they move.
+AUDIO_COLD_DIR = os.getenv("AUDIO_COLD_DIR") or None
+
+# Serving: stored names are unique, so clients and proxies may cache forever.
+# AUDIO_SENDFILE_MODE hands the bytes to a front proxy instead of streaming
+# them from Python: "x-accel" (nginx, internal location AUDIO_ACCEL_PREFIX
+# aliased to UPLOADS_DIR) or "x-sendfile" (Apache/lighttpd).
+AUDIO_CACHE_CONTROL = os.getenv("AUDIO_CACHE_CONTROL", "public, max-age=31536000, immutable")
+AUDIO_SENDFILE_MODE = os.getenv("AUDIO_SENDFILE_MODE", "").lower()
+AUDIO_ACCEL_PREFIX = os.getenv("AUDIO_ACCEL_PREFIX", "/protected-uploads/")
+AUDIO_COLD_ACCEL_PREFIX = os.getenv("AUDIO_COLD_ACCEL_PREFIX", "/protected-cold-uploads/")
+
+# The mimetypes module maps some of these to video/* or not at all
+AUDIO_MEDIA_TYPES = {
+    ".webm": "audio/webm",
+    ".opus": "audio/ogg",
+    ".ogg": "audio/ogg",
+    ".m4a": "audio/mp4",
+    ".mp3": "audio/mpeg",
+    ".wav": "audio/wav",
+}
+
+CHUNK_SIZE = 1024 * 1024  # 1 MiB
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_MB", "25")) * 1024 * 1024
+MAX_AUDIO_SECONDS = float(os.getenv("MAX_AUDIO_SECONDS", "600"))
+
+@dataclass
+class IngestedAudio:
+    """An upload that has been streamed to disk once and hashed."""
+    path: str
+    sha256: str
+    size: int
+    duration: Optional[float] = None
+    filename: Optional[str] = None  # Set once promoted into UPLOADS_DIR
+
+def probe_duration(file_path: str) -> Optional[float]:
+    """
+    Reads the duration from the container header without decoding samples.
+    Returns None when the format can't be probed this way (e.g. browser webm).
+    """
+    try:
+        import soundfile
+        return float(soundfile.info(file_path).duration)
+    except Exception:
+        return None
+
+def discard(ingested: Optional[IngestedAudio]):
+    """Removes a scratch file that was never promoted."""
+    if ingested and not ingested.filename and os.path.exists(ingested.path):
+        os.remove(ingested.path)
+
+async def ingest_upload(file: UploadFile, suffix: str = ".webm") -> IngestedAudio:
+    """
+    Streams an upload into a private scratch file in fixed-size chunks,
+    hashing as it goes and enforcing the size and duration caps before
+    anything downstream decodes it.
+    """
+    os.makedirs(SCRATCH_DIR, exist_ok=True)
+    fd, scratch_path = tempfile.mkstemp(prefix="upload_", suffix=suffix, dir=SCRATCH_DIR)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as buffer:
+            while True:
+                chunk = await file.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > MAX_UPLOAD_BYTES:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"Audio file exceeds {MAX_UPLOAD_BYTES // (1024 * 1024)} MB limit"
+                    )
+                digest.update(chunk)
+                buffer.write(chunk)
+
+        if size == 0:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Empty audio file")
+
+        duration = probe_duration(scratch_path)
+        if duration is not None and duration > MAX_AUDIO_SECONDS:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Audio longer than {int(MAX_AUDIO_SECONDS)} seconds"
+            )
+    except BaseException:
+        if os.path.exists(scratch_path):
+            os.remove(scratch_path)
+        raise
+
+    return IngestedAudio(path=scratch_path, sha256=digest.hexdigest(), size=size, duration=duration)
+
+def promote(ingested: IngestedAudio, suffix: str = ".webm") -> str:
+    """
+    Atomically moves a scratch upload into permanent storage.
+    Returns the stored filename (what Attempt.audio_url holds).
+    """
+    os.makedirs(UPLOADS_DIR, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    unique_id = str(uuid.uuid4())[:8]
+    audio_filename = f"audio_{timestamp}_{unique_id}{suffix}"
+    os.replace(ingested.path, os.path.join(UPLOADS_DIR, audio_filename))
+    ingested.path = os.path.join(UPLOADS_DIR, audio_filename)
+    ingested.filename = audio_filename
+    return audio_filename
+
+def unpromote(ingested: IngestedAudio, scratch_path: str):
+    """
+    Moves a promoted recording back to scratch_path (where it was before
+    promote) when saving its attempt failed, so no stored file is left
+    without an attempt and the caller's usual cleanup or retry applies.
+    """
+    if ingested.filename and os.path.exists(ingested.path):
+        os.replace(ingested.path, scratch_path)
+    ingested.path = scratch_path
+    ingested.filename = None
+
+def _resolve_in(directory: str, filename: str) -> Optional[str]:
+    root = os.path.realpath(directory)
+    path = os.path.realpath(os.path.join(root, filename))
+    if os.path.dirname(path) != root or not os.path.isfile(path):
+        return None
+    return path
+
+def resolve_upload(filename: str) -> Optional[str]:
+    """
+    Absolute path of a stored recording, or None. Looks in UPLOADS_DIR, then
+    AUDIO_COLD_DIR. Only plain file names directly inside those directories
+    resolve: no separators, "..", dotfiles (the scratch and job areas) or
+    symlinks pointing elsewhere.
+    """
+    if not filename or filename != os.path.basename(filename) or filename.startswith("."):
+        return None
+    path = _resolve_in(UPLOADS_DIR, filename)
+    if path is None and AUDIO_COLD_DIR:
+        path = _resolve_in(AUDIO_COLD_DIR, filename)
+    return path
+
+def is_cold(path: str) -> bool:
+    return bool(AUDIO_COLD_DIR) and os.path.dirname(path) == os.path.realpath(AUDIO_COLD_DIR)
+
+def archive_to_cold(filename: str) -> bool:
+    """
+    Moves a recording from UPLOADS_DIR to AUDIO_COLD_DIR under the same name.
+    The cold volume is usually another filesystem, so the file is copied to a
+    temporary name there and renamed into place before the hot copy is
+    removed; resolve_upload finds it in one place or the other throughout.
+    Returns False if there's no cold tier or the file isn't in hot storage.
+    """
+    if not AUDIO_COLD_DIR:
+        return False
+    path = resolve_upload(filename)
+    if path is None or is_cold(path):
+        return False
+    os.makedirs(AUDIO_COLD_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".archive_", dir=AUDIO_COLD_DIR)
+    try:
+        with os.fdopen(fd, "wb") as dst, open(path, "rb") as src:
+            shutil.copyfileobj(src, dst, CHUNK_SIZE)
+            dst.flush()
+            os.fsync(dst.fileno())
+        shutil.copystat(path, tmp_path)
+        os.replace(tmp_path, os.path.join(AUDIO_COLD_DIR, filename))
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.remove(path)
+    return True
+
+def audio_media_type(path: str) -> str:
+    extension = os.path.splitext(path)[1].lower()
+    return AUDIO_MEDIA_TYPES.get(extension) or mimetypes.guess_type(path)[0] or "application/octet-stream"
+
+def stage_for_job(ingested: IngestedAudio, job_id: str, suffix: str = ".webm") -> str:
+    """
+    Moves a scratch upload into the job staging area where any worker sharing
+    the uploads volume can pick it up. Returns the staged path.
+    """
+    os.makedirs(JOBS_DIR, exist_ok=True)
+    staged_path = os.path.join(JOBS_DIR, f"{job_id}{suffix}")
+    os.replace(ingested.path, staged_path)
+    ingested.path = staged_path
+    return staged_path
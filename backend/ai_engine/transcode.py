@@ -0,0 +1,194 @@
+"""
+Background re-encoding of stored recordings to compact speech Opus.
+
+Browsers upload whatever their recorder produces (often high-bitrate stereo
+webm). Once an attempt has been analysed its recording is only played back,
+so it's rewritten as mono low-bitrate Opus next to the original and the
+attempt is pointed at the new file with a compare-and-swap UPDATE (only if
+audio_url still names the original). If the swap loses a race, the new file
+is removed unless the attempt already uses it, so storage and the database
+never disagree.
+
+Originals stay on disk for AUDIO_TRANSCODE_GRACE_HOURS after the swap, since
+pages that loaded the attempt earlier still link to them (and they were
+served as immutable); purge_superseded_originals(), run by
+transcode_audio.py, deletes them afterwards.
+
+In the API, schedule_transcode() runs encodes on a small dedicated pool
+(TRANSCODE_WORKERS, at most TRANSCODE_MAX_PENDING waiting) so an upload
+burst can't start an unbounded number of ffmpeg processes next to the
+analysis pool. Anything turned away is picked up by the next backfill.
+"""
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+from database import SessionLocal
+from models import Attempt
+from .storage import resolve_upload
+
+load_dotenv()
+
+FFMPEG_PATH = os.getenv("FFMPEG_PATH", "ffmpeg")
+TRANSCODE_ENABLED = os.getenv("AUDIO_TRANSCODE_ENABLED", "true").lower() in ("1", "true", "yes")
+# 24 kb/s wideband Opus is transparent for a single voice
+TRANSCODE_BITRATE = os.getenv("AUDIO_TRANSCODE_BITRATE", "24k")
+# Opus supports 8/12/16/24/48 kHz; 16 kHz covers the speech band
+TRANSCODE_SAMPLE_RATE = int(os.getenv("AUDIO_TRANSCODE_SAMPLE_RATE", "16000"))
+TRANSCODE_TIMEOUT = float(os.getenv("AUDIO_TRANSCODE_TIMEOUT_SECONDS", "120"))
+TRANSCODE_SUFFIX = ".opus"
+TRANSCODE_WORKERS = int(os.getenv("TRANSCODE_WORKERS", "1"))
+TRANSCODE_MAX_PENDING = int(os.getenv("TRANSCODE_MAX_PENDING", "32"))
+TRANSCODE_GRACE_SECONDS = float(os.getenv("AUDIO_TRANSCODE_GRACE_HOURS", "24")) * 3600
+
+@dataclass
+class TranscodeResult:
+    filename: str
+    old_size: int
+    new_size: int
+
+def ffmpeg_available() -> bool:
+    return shutil.which(FFMPEG_PATH) is not None
+
+def transcode_to_opus(src_path: str, dst_path: str):
+    """Encodes src_path as mono speech Opus in an Ogg container. Raises on failure."""
+    subprocess.run(
+        [
+            FFMPEG_PATH, "-nostdin", "-hide_banner", "-loglevel", "error", "-y",
+            "-i", src_path,
+            "-vn", "-map_metadata", "-1",
+            "-ac", "1", "-ar", str(TRANSCODE_SAMPLE_RATE),
+            "-c:a", "libopus", "-b:a", TRANSCODE_BITRATE, "-application", "voip",
+            # One thread per encode; parallelism comes from running several
+            "-threads", "1",
+            "-f", "ogg", dst_path
+        ],
+        check=True, capture_output=True, timeout=TRANSCODE_TIMEOUT
+    )
+
+def transcode_attempt_audio(db: Session, attempt_id: int) -> Optional[TranscodeResult]:
+    """
+    Re-encodes one attempt's recording and swaps audio_url over to it.
+    Returns None when there's nothing to do, the encode fails or doesn't
+    make the file smaller.
+    """
+    old_filename = db.query(Attempt.audio_url).filter(Attempt.id == attempt_id).scalar()
+    if not old_filename or old_filename.endswith(TRANSCODE_SUFFIX):
+        return None
+    src_path = resolve_upload(old_filename)
+    if src_path is None:
+        return None
+
+    # Written next to the original (hot or cold tier) under a dotfile name
+    # that resolve_upload won't serve, then renamed into place
+    directory = os.path.dirname(src_path)
+    new_filename = os.path.splitext(old_filename)[0] + TRANSCODE_SUFFIX
+    fd, tmp_path = tempfile.mkstemp(prefix=".transcode_", suffix=TRANSCODE_SUFFIX, dir=directory)
+    os.close(fd)
+    try:
+        transcode_to_opus(src_path, tmp_path)
+        old_size = os.path.getsize(src_path)
+        new_size = os.path.getsize(tmp_path)
+        if new_size == 0 or new_size >= old_size:
+            os.remove(tmp_path)
+            return None
+        new_path = os.path.join(directory, new_filename)
+        os.replace(tmp_path, new_path)
+    except (OSError, subprocess.SubprocessError) as e:
+        print(f"Transcode of attempt {attempt_id} failed: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return None
+
+    # Compare-and-set: only succeeds if the attempt still points at the original
+    swapped = db.execute(
+        update(Attempt)
+        .where(Attempt.id == attempt_id, Attempt.audio_url == old_filename)
+        .values(audio_url=new_filename)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+
+    if swapped == 1:
+        # The original is left for purge_superseded_originals()
+        return TranscodeResult(filename=new_filename, old_size=old_size, new_size=new_size)
+    # Someone else changed the attempt first; keep our file only if that
+    # someone was another transcode of the same recording
+    current = db.query(Attempt.audio_url).filter(Attempt.id == attempt_id).scalar()
+    if current != new_filename and os.path.exists(new_path):
+        os.remove(new_path)
+    return None
+
+def transcode_attempt_in_background(attempt_id: int) -> Optional[TranscodeResult]:
+    """
+    Entry point for background tasks and the backfill: uses its own session
+    and never raises. No-op when disabled or ffmpeg isn't installed.
+    """
+    if not TRANSCODE_ENABLED or not ffmpeg_available():
+        return None
+    db = SessionLocal()
+    try:
+        return transcode_attempt_audio(db, attempt_id)
+    except Exception as e:
+        db.rollback()
+        print(f"Transcode of attempt {attempt_id} failed: {e}")
+        return None
+    finally:
+        db.close()
+
+_pool = None
+_slots = threading.BoundedSemaphore(TRANSCODE_WORKERS + TRANSCODE_MAX_PENDING)
+
+def schedule_transcode(attempt_id: int) -> bool:
+    """
+    Queues a background transcode without blocking the caller. Returns False
+    (and skips it) when disabled or the queue is full.
+    """
+    global _pool
+    if not TRANSCODE_ENABLED or not _slots.acquire(blocking=False):
+        return False
+    if _pool is None:
+        _pool = ThreadPoolExecutor(max_workers=TRANSCODE_WORKERS, thread_name_prefix="transcode")
+    future = _pool.submit(transcode_attempt_in_background, attempt_id)
+    future.add_done_callback(lambda _: _slots.release())
+    return True
+
+def shutdown_transcode_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+def purge_superseded_originals(db: Session, grace_seconds: float = TRANSCODE_GRACE_SECONDS) -> int:
+    """
+    Deletes originals whose transcoded .opus sibling has existed for longer
+    than grace_seconds and that no attempt references any more. Covers the
+    hot and cold tiers. Returns the number of files removed.
+    """
+    from .storage import UPLOADS_DIR, AUDIO_COLD_DIR
+    cutoff = time.time() - grace_seconds
+    removed = 0
+    for directory in filter(None, (UPLOADS_DIR, AUDIO_COLD_DIR)):
+        if not os.path.isdir(directory):
+            continue
+        for entry in os.scandir(directory):
+            if entry.name.startswith(".") or entry.name.endswith(TRANSCODE_SUFFIX) or not entry.is_file():
+                continue
+            sibling = os.path.join(directory, os.path.splitext(entry.name)[0] + TRANSCODE_SUFFIX)
+            try:
+                if os.path.getmtime(sibling) > cutoff:
+                    continue
+            except OSError:
+                continue  # Not transcoded
+            if db.query(Attempt.id).filter(Attempt.audio_url == entry.name).first() is None:
+                os.remove(entry.path)
+                removed += 1
+    return removed
@@ -1,22 +1,51 @@
-from openai import OpenAI
 import os
+import hashlib
+from cache import LRUCache, DiskCache, TieredCache
+from .transcribers import Transcriber, get_transcriber
 
-def transcribe_audio(client: OpenAI, file_path: str):
+TRANSCRIBE_LANGUAGE = "en"
+TRANSCRIBE_PROMPT = "Umm, let me think like, uh, this is a verbatim transcript that includes all filler words and hesitations."
+
+# Identical recordings (retries, double submits) are served from here instead
+# of being re-uploaded to Whisper.
+transcript_cache = TieredCache(
+    LRUCache(maxsize=int(os.getenv("TRANSCRIPT_CACHE_SIZE", "512"))),
+    DiskCache(
+        os.getenv("TRANSCRIPT_CACHE_DIR", os.path.join("cache", "transcripts")),
+        max_bytes=int(os.getenv("TRANSCRIPT_CACHE_MAX_MB", "64")) * 1024 * 1024
+    )
+)
+
+def file_sha256(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def transcript_cache_key(audio_hash: str, model: str, language: str = TRANSCRIBE_LANGUAGE, prompt: str = TRANSCRIBE_PROMPT) -> str:
+    return hashlib.sha256("\x1f".join([audio_hash, model, language, prompt]).encode("utf-8")).hexdigest()
+
+async def transcribe_audio(file_path: str, audio_hash: str = None, transcriber: Transcriber = None):
     """
-    Transcribes audio using OpenAI Whisper.
+    Transcribes audio with the configured backend (see ai_engine.transcribers).
+    Results are cached by audio content hash + backend/model, language and
+    prompt; pass audio_hash when it's already known to skip re-hashing the file.
     """
-    if not client:
+    transcriber = transcriber or get_transcriber()
+    if not transcriber.available:
         return "Transcription unavailable (No API Key)"
-        
+
+    key = transcript_cache_key(audio_hash or file_sha256(file_path), f"{transcriber.name}:{transcriber.model}")
+    cached = transcript_cache.get(key)
+    if cached is not None:
+        return cached["text"]
+
     try:
-        with open(file_path, "rb") as audio_file:
-            transcription = client.audio.transcriptions.create(
-                model="whisper-1", 
-                file=audio_file,
-                language="en",
-                prompt="Umm, let me think like, uh, this is a verbatim transcript that includes all filler words and hesitations."
-            )
-        return transcription.text
+        text = await transcriber.transcribe(file_path, TRANSCRIBE_LANGUAGE, TRANSCRIBE_PROMPT)
     except Exception as e:
         print(f"Transcription error: {e}")
         return f"Error during transcription: {str(e)}"
+
+    transcript_cache.set(key, {"text": text})
+    return text
@@ -0,0 +1,150 @@
+"""
+Speech-to-text backends.
+
+Every backend implements the Transcriber protocol and registers itself under
+a name; the deployment picks one with TRANSCRIBER_BACKEND (default "openai").
+transcribe_many() lets batch callers amortise per-backend setup such as
+loading a local model once for a whole batch.
+"""
+import os
+import asyncio
+import hashlib
+import random
+import threading
+from pathlib import Path
+from typing import List, Protocol
+from dotenv import load_dotenv
+
+load_dotenv()
+
+class Transcriber(Protocol):
+    name: str
+    model: str
+    available: bool
+
+    async def transcribe(self, file_path: str, language: str, prompt: str) -> str:
+        ...
+
+    async def transcribe_many(self, file_paths: List[str], language: str, prompt: str) -> List[str]:
+        ...
+
+TRANSCRIBERS = {}
+_instances = {}
+_instances_lock = threading.Lock()
+
+def register_transcriber(name: str):
+    def register(cls):
+        cls.name = name
+        TRANSCRIBERS[name] = cls
+        return cls
+    return register
+
+def get_transcriber(name: str = None) -> Transcriber:
+    """Returns the (shared) instance of the named or configured backend."""
+    name = name or os.getenv("TRANSCRIBER_BACKEND", "openai")
+    if name not in TRANSCRIBERS:
+        raise ValueError(f"Unknown transcriber backend '{name}'. Available: {', '.join(sorted(TRANSCRIBERS))}")
+    with _instances_lock:
+        if name not in _instances:
+            _instances[name] = TRANSCRIBERS[name]()
+        return _instances[name]
+
+class BaseTranscriber:
+    name = "base"
+    model = ""
+    available = True  # False when the backend isn't configured (e.g. no API key)
+
+    async def transcribe(self, file_path: str, language: str, prompt: str) -> str:
+        raise NotImplementedError
+
+    async def transcribe_many(self, file_paths: List[str], language: str, prompt: str) -> List[str]:
+        return [await self.transcribe(path, language, prompt) for path in file_paths]
+
+@register_transcriber("openai")
+class OpenAITranscriber(BaseTranscriber):
+    """Hosted Whisper through the OpenAI API."""
+    model = "whisper-1"
+
+    def __init__(self):
+        from .openai_client import OPENAI_API_KEY
+        self.available = bool(OPENAI_API_KEY)
+
+    async def transcribe(self, file_path: str, language: str, prompt: str) -> str:
+        from .openai_client import call_openai
+        transcription = await call_openai(lambda client: client.audio.transcriptions.create(
+            model=self.model,
+            file=Path(file_path),
+            language=language,
+            prompt=prompt
+        ))
+        return transcription.text
+
+    async def transcribe_many(self, file_paths: List[str], language: str, prompt: str) -> List[str]:
+        # The shared client's semaphore bounds how many of these run at once
+        return list(await asyncio.gather(*(self.transcribe(p, language, prompt) for p in file_paths)))
+
+@register_transcriber("local")
+class LocalWhisperTranscriber(BaseTranscriber):
+    """
+    CPU-local Whisper via faster-whisper (optional dependency). The model is
+    loaded once per process and reused across calls and batches.
+    """
+    def __init__(self):
+        self.model = os.getenv("LOCAL_WHISPER_MODEL", "base.en")
+        self.compute_type = os.getenv("LOCAL_WHISPER_COMPUTE_TYPE", "int8")
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._model is None:
+                try:
+                    from faster_whisper import WhisperModel
+                except ImportError:
+                    raise RuntimeError("Local transcription requires the 'faster-whisper' package")
+                self._model = WhisperModel(self.model, device="cpu", compute_type=self.compute_type)
+            return self._model
+
+    def _run(self, file_paths: List[str], language: str, prompt: str) -> List[str]:
+        model = self._load()
+        results = []
+        for path in file_paths:
+            segments, _ = model.transcribe(path, language=language, initial_prompt=prompt)
+            results.append(" ".join(segment.text.strip() for segment in segments))
+        return results
+
+    async def transcribe(self, file_path: str, language: str, prompt: str) -> str:
+        return (await self.transcribe_many([file_path], language, prompt))[0]
+
+    async def transcribe_many(self, file_paths: List[str], language: str, prompt: str) -> List[str]:
+        return await asyncio.to_thread(self._run, file_paths, language, prompt)
+
+# Canned speech used by the stand-in backend
+STUB_TRANSCRIPTS = [
+    "I think AI is going to change the world in many ways. It will automate jobs but also create new ones. We need to be careful about ethics.",
+    "Climate change is a serious issue. Um, we need to reduce carbon emissions and switch to renewable energy sources like solar and wind.",
+    "My most embarrassing moment was when I, uh, tripped on stage during a graduation ceremony. Everyone laughed, but I learned to laugh at myself.",
+]
+
+@register_transcriber("stub")
+class StubTranscriber(BaseTranscriber):
+    """
+    Deterministic offline stand-in for load tests and benchmarks. The same
+    file always yields the same transcript. Latency and failure rate are set
+    with STUB_TRANSCRIBER_LATENCY_MS and STUB_TRANSCRIBER_ERROR_RATE.
+    """
+    model = "stub"
+
+    def __init__(self):
+        self.latency = float(os.getenv("STUB_TRANSCRIBER_LATENCY_MS", "0")) / 1000
+        self.error_rate = float(os.getenv("STUB_TRANSCRIBER_ERROR_RATE", "0"))
+        self._random = random.Random(int(os.getenv("STUB_TRANSCRIBER_SEED", "0")))
+
+    async def transcribe(self, file_path: str, language: str, prompt: str) -> str:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.error_rate and self._random.random() < self.error_rate:
+            raise RuntimeError("Injected transcription failure")
+        with open(file_path, "rb") as f:
+            digest = hashlib.sha256(f.read()).digest()
+        return STUB_TRANSCRIPTS[digest[0] % len(STUB_TRANSCRIPTS)]
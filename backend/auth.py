@@ -1,12 +1,15 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 import bcrypt
+from fastapi import HTTPException, status
 from jose import jwt
 from datetime import datetime, timedelta
 from typing import Optional
-from google.oauth2 import id_token
-from google.auth.transport import requests as google_requests
-import requests
 import os
 from dotenv import load_dotenv
+from oauth_verifiers import get_oauth_verifier
 
 # Load environment variables from .env file
 load_dotenv()
@@ -16,12 +19,89 @@ SECRET_KEY = os.getenv("SECRET_KEY", "supersecretkey")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
 
-# Google Client ID
-GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
+# bcrypt work factor for new hashes; older hashes are upgraded on login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
 
-# GitHub OAuth credentials
-GITHUB_CLIENT_ID = os.getenv("GITHUB_CLIENT_ID")
-GITHUB_CLIENT_SECRET = os.getenv("GITHUB_CLIENT_SECRET")
+# Hashing runs on its own small thread pool (bcrypt releases the GIL), so a
+# burst of logins or signups can't occupy the request threadpool or the
+# event loop. Requests beyond PASSWORD_HASH_MAX_PENDING waiting get a 503.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", str(PASSWORD_HASH_WORKERS * 16)))
+
+class PasswordHashingPool:
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self._outstanding = 0
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._run_total = 0.0
+
+    def submit(self, fn, *args) -> Future:
+        with self._lock:
+            if self._outstanding >= self.workers + self.max_pending:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many authentication requests, please retry shortly",
+                    headers={"Retry-After": "1"}
+                )
+            self._outstanding += 1
+            self.submitted += 1
+        queued_at = time.perf_counter()
+
+        def task():
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    wait = started - queued_at
+                    self._wait_total += wait
+                    self._wait_max = max(self._wait_max, wait)
+                    self._run_total += time.perf_counter() - started
+                    self.completed += 1
+
+        future = self._executor.submit(task)
+        # Also runs for futures cancelled before they started
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, future):
+        with self._lock:
+            self._outstanding -= 1
+
+    async def run(self, fn, *args):
+        """Awaits fn(*args) on the pool without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def run_blocking(self, fn, *args):
+        """For sync callers: waits for fn(*args), still bounded by the pool."""
+        return self.submit(fn, *args).result()
+
+    def stats(self):
+        with self._lock:
+            completed = self.completed or 1
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "bcrypt_rounds": BCRYPT_ROUNDS,
+                "in_flight": self._outstanding,
+                "queued": max(0, self._outstanding - self.workers),
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_wait_ms": round(self._wait_total / completed * 1000, 2),
+                "max_wait_ms": round(self._wait_max * 1000, 2),
+                "avg_run_ms": round(self._run_total / completed * 1000, 2)
+            }
+
+password_hashing = PasswordHashingPool(PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash."""
@@ -29,10 +109,25 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     """Hash a password using bcrypt."""
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed.decode('utf-8')
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True if the hash was made with a different cost than BCRYPT_ROUNDS ("$2b$<cost>$...")."""
+    try:
+        return int(hashed_password.split("$")[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return False
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password on the password hashing pool."""
+    return await password_hashing.run(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash on the password hashing pool."""
+    return await password_hashing.run(get_password_hash, password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -44,117 +139,9 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 def verify_google_token(token: str):
-    """Verify Google OAuth token"""
-    import logging
-    logger = logging.getLogger(__name__)
-    
-    try:
-        # Try to verify as ID token
-        logger.info("Attempting to verify as ID token")
-        idinfo = id_token.verify_oauth2_token(token, google_requests.Request(), GOOGLE_CLIENT_ID)
-        logger.info(f"ID token verified successfully: {idinfo}")
-        return idinfo
-    except ValueError as e:
-        logger.warning(f"ID token verification failed: {e}")
-        # If that fails, try to verify as access token
-        try:
-            logger.info("Attempting to verify as access token")
-            response = requests.get(
-                f'https://www.googleapis.com/oauth2/v3/userinfo?access_token={token}'
-            )
-            logger.info(f"Access token verification response status: {response.status_code}")
-            if response.status_code == 200:
-                user_info = response.json()
-                logger.info(f"Access token verified successfully: {user_info}")
-                return user_info
-            logger.error(f"Access token verification failed with status {response.status_code}: {response.text}")
-            return None
-        except Exception as e:
-            logger.error(f"Exception during access token verification: {e}")
-            return None
+    """Verify Google OAuth token (ID token or access token) with the configured OAuth verifier."""
+    return get_oauth_verifier().verify_google_token(token)
 
 def verify_github_code(code: str):
     """Exchange GitHub OAuth code for access token and get user info"""
-    import logging
-    logger = logging.getLogger(__name__)
-    
-    try:
-        # Exchange code for access token
-        logger.info(f"Exchanging GitHub code for access token: {code[:10]}...")
-        logger.info(f"Using Client ID: {GITHUB_CLIENT_ID}")
-        logger.info(f"Using Client Secret: {GITHUB_CLIENT_SECRET[:5] if GITHUB_CLIENT_SECRET else 'None'}...")
-        
-        token_response = requests.post(
-            'https://github.com/login/oauth/access_token',
-            headers={'Accept': 'application/json'},
-            data={
-                'client_id': GITHUB_CLIENT_ID,
-                'client_secret': GITHUB_CLIENT_SECRET,
-                'code': code
-            }
-        )
-        
-        logger.info(f"Token exchange response status: {token_response.status_code}")
-        logger.info(f"Token exchange response: {token_response.text}")
-        
-        if token_response.status_code != 200:
-            logger.error(f"Failed to exchange code: {token_response.text}")
-            return None
-            
-        token_data = token_response.json()
-        
-        # Check for error in response
-        if 'error' in token_data:
-            logger.error(f"GitHub returned error: {token_data}")
-            return None
-            
-        access_token = token_data.get('access_token')
-        
-        if not access_token:
-            logger.error(f"No access token in response: {token_data}")
-            return None
-        
-        logger.info(f"Successfully got access token: {access_token[:10]}...")
-        
-        # Get user info
-        logger.info("Fetching GitHub user info")
-        user_response = requests.get(
-            'https://api.github.com/user',
-            headers={
-                'Authorization': f'Bearer {access_token}',
-                'Accept': 'application/json'
-            }
-        )
-        
-        logger.info(f"User info response status: {user_response.status_code}")
-        
-        if user_response.status_code != 200:
-            logger.error(f"Failed to get user info: {user_response.text}")
-            return None
-            
-        user_data = user_response.json()
-        logger.info(f"Got user data: {user_data.get('login')}")
-        
-        # Get user email if not public
-        if not user_data.get('email'):
-            logger.info("Fetching GitHub user emails")
-            email_response = requests.get(
-                'https://api.github.com/user/emails',
-                headers={
-                    'Authorization': f'Bearer {access_token}',
-                    'Accept': 'application/json'
-                }
-            )
-            if email_response.status_code == 200:
-                emails = email_response.json()
-                logger.info(f"Got emails: {emails}")
-                primary_email = next((e for e in emails if e.get('primary')), None)
-                if primary_email:
-                    user_data['email'] = primary_email['email']
-        
-        logger.info(f"GitHub user verified: {user_data.get('login')} with email: {user_data.get('email')}")
-        return user_data
-        
-    except Exception as e:
-        logger.error(f"Exception during GitHub verification: {e}", exc_info=True)
-        return None
+    return get_oauth_verifier().verify_github_code(code)
@@ -0,0 +1,94 @@
+"""
+Benchmark: interned Myers alignment vs. difflib.SequenceMatcher for
+target-vs-spoken diffs on read-aloud scripts of growing length.
+
+    python bench_alignment.py [--repeat 3]
+
+At ~150 spoken words per minute, 1500 words is a 10-minute script.
+"""
+import argparse
+import difflib
+import random
+import time
+from ai_engine.alignment import align_to_target
+
+# Small vocabulary so scripts are repetitive, which is what hurts difflib
+VOCABULARY = ("the a to and of we is it that our this for in on with you will be are team "
+              "customers growth product plan quarter results people market value").split()
+
+def make_script(words: int, rng: random.Random) -> str:
+    return " ".join(rng.choice(VOCABULARY) for _ in range(words))
+
+def make_reading(script: str, rng: random.Random, error_rate: float) -> str:
+    """Simulates reading the script aloud with skips, substitutions and fillers."""
+    spoken = []
+    for word in script.split():
+        roll = rng.random()
+        if roll < error_rate / 3:
+            continue
+        if roll < 2 * error_rate / 3:
+            spoken.append(rng.choice(VOCABULARY))
+        elif roll < error_rate:
+            spoken.extend([word, "um"])
+        else:
+            spoken.append(word)
+    return " ".join(spoken)
+
+def difflib_diff(target_text: str, transcript: str, autojunk: bool = True):
+    """
+    The previous implementation from process_attempt. With autojunk (the
+    default it ran with) difflib ignores words making up >1% of a 200+ word
+    script, which is why it "matches" almost nothing on long scripts.
+    """
+    result = []
+    target_words = target_text.split()
+    spoken_words = transcript.split()
+    matcher = difflib.SequenceMatcher(None, [w.lower() for w in target_words], [w.lower() for w in spoken_words], autojunk=autojunk)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        segment_text = " ".join(target_words[i1:i2])
+        if not segment_text:
+            continue
+        if tag == 'equal':
+            result.append({"status": "matched", "text": segment_text})
+        elif tag == 'replace' or tag == 'delete':
+            result.append({"status": "missed", "text": segment_text})
+    return result
+
+def matched_words(segments):
+    return sum(len(s["text"].split()) for s in segments if s["status"] == "matched")
+
+def timed(fn, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    rng = random.Random(7)
+
+    print(f"{'words':>6} {'errors':>6} | {'difflib ms':>10} {'matched':>7} | {'no-junk ms':>10} {'matched':>7} | {'myers ms':>9} {'matched':>7}")
+    for words in (150, 750, 1500, 3000):
+        script = make_script(words, rng)
+        for error_rate in (0.05, 0.3):
+            reading = make_reading(script, rng, error_rate)
+            old_time, old = timed(lambda: difflib_diff(script, reading), args.repeat)
+            full_time, full = timed(lambda: difflib_diff(script, reading, autojunk=False), args.repeat)
+            new_time, new = timed(lambda: align_to_target(script, reading), args.repeat)
+            print(f"{words:>6} {error_rate:>6.2f} | {old_time * 1000:>10.2f} {matched_words(old):>7} "
+                  f"| {full_time * 1000:>10.2f} {matched_words(full):>7} "
+                  f"| {new_time * 1000:>9.2f} {matched_words(new):>7}")
+
+    # Completely off-topic speech against a long script
+    script = make_script(1500, rng)
+    off_topic = " ".join(f"word{i}" for i in range(1500))
+    old_time, _ = timed(lambda: difflib_diff(script, off_topic), args.repeat)
+    new_time, _ = timed(lambda: align_to_target(script, off_topic), args.repeat)
+    print(f"off-topic 1500 words | difflib {old_time * 1000:.2f} ms | myers {new_time * 1000:.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Benchmark: single-pass filler detector vs. the old per-filler substring count.
+
+    python bench_fillers.py [--words 200000] [--repeat 5]
+"""
+import argparse
+import random
+import time
+from ai_engine.fillers import LEXICONS, detect_fillers
+
+VOCABULARY = [
+    "i", "think", "also", "likely", "the", "project", "so", "um", "uh", "like", "you", "know",
+    "actually", "basically", "literally", "we", "should", "some", "umbrella", "soon", "reason",
+    "unlike", "knowledge", "because", "and", "then", "really", "important", "team", "results",
+]
+
+def make_transcript(words: int, seed: int = 42) -> str:
+    rng = random.Random(seed)
+    return " ".join(rng.choice(VOCABULARY) for _ in range(words))
+
+def substring_count(text: str, fillers):
+    """The previous implementation: one scan per filler, substring matches."""
+    return sum(text.lower().count(f) for f in fillers)
+
+def timed(fn, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--words", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    fillers = LEXICONS["default"]
+    for words in (1000, 10000, args.words):
+        text = make_transcript(words)
+        old_time, old_count = timed(lambda: substring_count(text, fillers), args.repeat)
+        new_time, report = timed(lambda: detect_fillers(text), args.repeat)
+        print(f"{words:>8} words | substring: {old_time * 1000:8.2f} ms, count={old_count:<7} "
+              f"| detector: {new_time * 1000:8.2f} ms, count={report.total}")
+
+    # Cost per filler: the old approach rescans once per filler, the detector doesn't
+    text = make_transcript(args.words)
+    big_lexicon = fillers + [f"filler{i}" for i in range(200)] + [f"you know {i}" for i in range(50)]
+    from ai_engine.fillers import FillerDetector
+    detector = FillerDetector(big_lexicon)
+    old_time, _ = timed(lambda: substring_count(text, big_lexicon), args.repeat)
+    new_time, _ = timed(lambda: detector.detect(text), args.repeat)
+    print(f"{len(big_lexicon)} fillers, {args.words} words | substring: {old_time * 1000:.2f} ms | detector: {new_time * 1000:.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark: throughput of the read endpoints under fixed concurrency.
+
+Start the API (uvicorn main:app, a single worker process so runs compare
+like for like), then:
+
+    python bench_reads.py [--base-url http://localhost:8000] [--concurrency 64]
+                          [--requests 2000] [--token <JWT>]
+
+Run it once against the sync (threadpool) endpoints and once against the
+async ones to get before/after numbers. Endpoints that need a login are
+skipped unless --token is given.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import httpx
+
+PUBLIC_ENDPOINTS = ["/topics", "/categories", "/leaderboard", "/leaderboard?type=average"]
+USER_ENDPOINTS = ["/auth/me", "/users/me/attempts", "/users/me/achievements"]
+
+async def run_endpoint(client: httpx.AsyncClient, path: str, total: int, concurrency: int, headers: dict):
+    latencies = []
+    errors = 0
+    remaining = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            try:
+                response = await client.get(path, headers=headers)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                # Dropped connections and timeouts count against the endpoint
+                failed = True
+            latencies.append(time.perf_counter() - start)
+            if failed:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "rps": total / elapsed,
+        "p50": statistics.median(latencies) * 1000,
+        "p99": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        "errors": errors
+    }
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--token", help="Bearer token for the /users/me and /auth/me endpoints")
+    args = parser.parse_args()
+
+    endpoints = PUBLIC_ENDPOINTS + (USER_ENDPOINTS if args.token else [])
+    headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60) as client:
+        print(f"concurrency={args.concurrency} requests={args.requests}")
+        print(f"{'endpoint':<28} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+        for path in endpoints:
+            # Warm connections and caches
+            await run_endpoint(client, path, args.concurrency, args.concurrency, headers)
+            result = await run_endpoint(client, path, args.requests, args.concurrency, headers)
+            print(f"{path:<28} {result['rps']:>9.1f} {result['p50']:>9.2f} {result['p99']:>9.2f} {result['errors']:>7}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,165 @@
+"""
+Small in-process caches shared by the AI pipeline and the service layer.
+
+LRUCache is a thread-safe, size-bounded mapping with optional TTL.
+DiskCache stores JSON values as files and evicts the least recently used
+ones once the directory grows past a byte budget. TieredCache puts an
+LRUCache in front of a DiskCache. All of them count hits and misses.
+"""
+import os
+import json
+import time
+import threading
+import tempfile
+from collections import OrderedDict
+
+_MISSING = object()
+
+class LRUCache:
+    def __init__(self, maxsize: int = 1024, ttl: float = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl: float = None):
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+class DiskCache:
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total_bytes = None  # Computed on first write
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _path(self, key: str):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str, default=None):
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+            os.utime(path)  # Recency for eviction
+            self.hits += 1
+            return value
+        except (OSError, ValueError):
+            self.misses += 1
+            return default
+
+    def set(self, key: str, value):
+        os.makedirs(self.directory, exist_ok=True)
+        data = json.dumps(value).encode("utf-8")
+        # Write-then-rename so concurrent readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        path = self._path(key)
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_size()
+            previous = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+            self._total_bytes += len(data) - previous
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _scan_size(self):
+        return sum(e.stat().st_size for e in os.scandir(self.directory) if e.name.endswith(".json"))
+
+    def _evict(self):
+        """Drop least recently used entries until under 90% of the budget."""
+        entries = sorted(
+            (e for e in os.scandir(self.directory) if e.name.endswith(".json")),
+            key=lambda e: e.stat().st_mtime
+        )
+        target = self.max_bytes * 0.9
+        for entry in entries:
+            if self._total_bytes <= target:
+                break
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+                self._total_bytes -= size
+                self.evictions += 1
+            except OSError:
+                pass
+
+    def stats(self):
+        return {
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
+
+class TieredCache:
+    """Memory LRU in front of a disk cache; disk hits are promoted to memory."""
+    def __init__(self, memory: LRUCache, disk: DiskCache):
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key: str, default=None):
+        value = self.memory.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        value = self.disk.get(key, _MISSING)
+        if value is not _MISSING:
+            self.memory.set(key, value)
+            return value
+        return default
+
+    def set(self, key: str, value):
+        self.memory.set(key, value)
+        try:
+            self.disk.set(key, value)
+        except OSError as e:
+            print(f"Disk cache write failed: {e}")
+
+    def stats(self):
+        memory, disk = self.memory.stats(), self.disk.stats()
+        lookups = memory["hits"] + memory["misses"]
+        return {
+            "memory": memory,
+            "disk": disk,
+            "hit_rate": round((memory["hits"] + disk["hits"]) / lookups, 3) if lookups else 0.0
+        }
@@ -0,0 +1,10 @@
+"""
+pytest setup: importing main creates tables on DATABASE_URL, so the tests
+point it at a throwaway SQLite file before any test module is imported and
+never touch the working talk2me.db.
+"""
+import os
+import tempfile
+
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="talk2me_test_"), "talk2me.db")
+os.environ.pop("DATABASE_READ_URL", None)
@@ -1,20 +1,32 @@
+import os
+import time
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
 from sqlalchemy.orm import Session
-from database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_db, get_async_db
 from models import User
 from auth import SECRET_KEY, ALGORITHM
+from cache import LRUCache
+from principals import UserPrincipal, principals
 
 security = HTTPBearer()
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
-    token = credentials.credentials
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+credentials_exception = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Could not validate credentials",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+
+# Token string -> user id for tokens whose signature was already verified;
+# entries expire with the token itself
+_verified_tokens = LRUCache(maxsize=int(os.getenv("TOKEN_CACHE_SIZE", "10000")))
+
+def _user_id_from_token(token: str) -> int:
+    user_id = _verified_tokens.get(token)
+    if user_id is not None:
+        return user_id
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id_str = payload.get("sub")
@@ -23,13 +35,35 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
         user_id = int(user_id_str)
     except (JWTError, ValueError, TypeError):
         raise credentials_exception
-    
-    user = db.query(User).filter(User.id == user_id).first()
-    if user is None:
-        raise credentials_exception
-    return user
+    expires_in = payload["exp"] - time.time() if payload.get("exp") else None
+    if expires_in is None or expires_in > 0:
+        _verified_tokens.set(token, user_id, ttl=expires_in)
+    return user_id
+
+def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
+    user_id = _user_id_from_token(credentials.credentials)
+    principal = principals.get(user_id)
+    if principal is None:
+        user = db.query(User).filter(User.id == user_id).first()
+        if user is None:
+            raise credentials_exception
+        principal = UserPrincipal.from_user(user)
+        principals.set(user_id, principal)
+    return principal
+
+async def get_current_user_async(credentials: HTTPAuthorizationCredentials = Depends(security), db: AsyncSession = Depends(get_async_db)):
+    """get_current_user for async endpoints; runs on the event loop."""
+    user_id = _user_id_from_token(credentials.credentials)
+    principal = principals.get(user_id)
+    if principal is None:
+        user = await db.get(User, user_id)
+        if user is None:
+            raise credentials_exception
+        principal = UserPrincipal.from_user(user)
+        principals.set(user_id, principal)
+    return principal
 
-def get_current_admin(current_user: User = Depends(get_current_user)):
+def get_current_admin(current_user: UserPrincipal = Depends(get_current_user)):
     if not current_user.is_superadmin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
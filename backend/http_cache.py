@@ -0,0 +1,145 @@
+"""
+HTTP revalidation helpers shared by cached endpoints, and conditional /
+byte-range file responses for stored media.
+"""
+import hashlib
+import os
+import re
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional, Tuple
+from fastapi import Request, Response, status
+from fastapi.responses import StreamingResponse
+
+def strong_etag(data: bytes) -> str:
+    return '"' + hashlib.sha256(data).hexdigest()[:32] + '"'
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    True if an If-None-Match header matches the ETag. Uses the weak
+    comparison RFC 9110 prescribes for If-None-Match.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    bare = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == bare:
+            return True
+    return False
+
+def modified_since(if_modified_since: str, mtime: float) -> bool:
+    """False if an If-Modified-Since header shows the client's copy is current."""
+    if not if_modified_since:
+        return True
+    try:
+        since = parsedate_to_datetime(if_modified_since).timestamp()
+    except (TypeError, ValueError):
+        return True
+    # HTTP dates have one-second resolution
+    return int(mtime) > since
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+def parse_byte_range(range_header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parses a single-range "Range: bytes=..." header into inclusive (start,
+    end) offsets. Returns None when the header should be ignored (absent,
+    malformed or multi-range: the full file is served) and raises ValueError
+    when the range can't be satisfied.
+    """
+    if not range_header:
+        return None
+    match = _RANGE_RE.match(range_header.strip())
+    if not match or match.group(1) == match.group(2) == "":
+        return None
+    first, last = match.groups()
+    if first == "":
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError("unsatisfiable range")
+        return max(0, size - length), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None  # Invalid range spec
+    if start >= size:
+        raise ValueError("unsatisfiable range")
+    return start, min(int(last), size - 1) if last else size - 1
+
+def _read_range(path: str, start: int, end: int, chunk_size: int = 64 * 1024):
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+def file_response(
+    request: Request,
+    path: str,
+    media_type: str,
+    cache_control: str,
+    offload_headers: Optional[dict] = None
+) -> Response:
+    """
+    Serves an immutable file with a strong ETag, Last-Modified and
+    Cache-Control; answers revalidation with 304, Range requests with
+    206 / 416 and HEAD with the headers alone. With offload_headers (X-Accel-Redirect / X-Sendfile), the
+    body is left to the front proxy, which also handles Range itself.
+    """
+    stat = os.stat(path)
+    size = stat.st_size
+    # Stored files are never rewritten in place, so name + size + mtime
+    # identify the bytes
+    etag = strong_etag(f"{os.path.basename(path)}:{size}:{stat.st_mtime_ns}".encode("utf-8"))
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+        "Cache-Control": cache_control,
+        "Accept-Ranges": "bytes"
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        not_modified = etag_matches(if_none_match, etag)
+    else:
+        not_modified = not modified_since(request.headers.get("if-modified-since"), stat.st_mtime)
+    if not_modified:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    if offload_headers:
+        return Response(media_type=media_type, headers={**headers, **offload_headers})
+
+    byte_range = None
+    if_range = request.headers.get("if-range")
+    # If-Range: only honour Range when the client's copy is this exact version
+    if if_range is None or if_range.strip() == etag:
+        try:
+            byte_range = parse_byte_range(request.headers.get("range"), size)
+        except ValueError:
+            return Response(
+                status_code=416,  # Range Not Satisfiable
+                headers={**headers, "Content-Range": f"bytes */{size}"}
+            )
+
+    start, end = byte_range if byte_range else (0, size - 1)
+    headers["Content-Length"] = str(end - start + 1 if size else 0)
+    if byte_range:
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    status_code = status.HTTP_206_PARTIAL_CONTENT if byte_range else status.HTTP_200_OK
+    if request.method == "HEAD":
+        # Same headers as the GET would send, without reading the file
+        return Response(status_code=status_code, media_type=media_type, headers=headers)
+    return StreamingResponse(
+        _read_range(path, start, end) if size else iter(()),
+        status_code=status_code,
+        media_type=media_type,
+        headers=headers
+    )
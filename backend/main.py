@@ -1,35 +1,56 @@
-from fastapi import FastAPI, UploadFile, File, Form, Depends, HTTPException, status
+from fastapi import FastAPI, UploadFile, File, Form, Depends, HTTPException, status, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Union
 import os
 
-from database import engine, get_db
+from database import engine, get_db, get_read_db, get_async_db, get_async_read_db, dispose_async_engines
 from models import Base, User
 from schemas import (
     Topic, TopicCreate, CustomTopicCreate,
     Category, CategoryCreate, CategoryUpdate,
     UserSignup, UserLogin, Token, UserResponse, UserUpdate,
-    AttemptResponse,
+    AttemptResponse, AttemptPage, AttemptSummaryPage, UserPage, ContactMessagePage,
     ContactMessageCreate, ContactMessageResponse,
-    GoogleAuthRequest, GitHubAuthRequest, OnboardingUpdate
+    GoogleAuthRequest, GitHubAuthRequest, OnboardingUpdate,
+    AnalysisJobResponse
 )
-from services.topics import get_all_topics, get_topic_by_id, create_topic, delete_topic, create_custom_topic, update_topic
+from services.topics import get_all_topics, get_all_topics_async, get_topic_by_id, create_topic, delete_topic, create_custom_topic, update_topic
 from services.categories import (
-    get_all_categories, get_category_by_id, create_category, 
+    get_all_categories_async, get_category_by_id, create_category, 
     update_category, delete_category
 )
 from services.users import get_all_users, get_user_by_id, update_user, delete_user, toggle_admin_status
-from services.attempts import get_all_attempts, delete_attempt, get_attempts_by_user
+from services.attempts import (
+    get_all_attempts, delete_attempt, get_attempts_by_user_async,
+    get_attempt_summaries_by_user_async, get_attempt_for_user_async
+)
 from ai_engine.pipeline import process_attempt
-from services.leaderboard import get_leaderboard
+from ai_engine.storage import (
+    ingest_upload, stage_for_job, discard, resolve_upload, audio_media_type,
+    is_cold, AUDIO_CACHE_CONTROL, AUDIO_SENDFILE_MODE, AUDIO_ACCEL_PREFIX, AUDIO_COLD_ACCEL_PREFIX
+)
+from ai_engine.transcode import schedule_transcode, shutdown_transcode_pool
+from ai_engine.executor import warm_pool, shutdown_pool
+from ai_engine.transcribe import transcript_cache
+from ai_engine.coach import feedback_cache
+from services.leaderboard import get_leaderboard_response_async
+from http_cache import etag_matches, file_response
+from pagination import DEFAULT_PAGE_SIZE
+from services.jobs import create_job, get_job, new_job_id
 from services.contact import create_contact_message, get_all_contact_messages
 from services.achievements import (
-    get_user_achievements, check_and_unlock_achievements, unlock_hello_speaker
+    get_user_achievements_async, check_and_unlock_achievements, unlock_hello_speaker,
+    calculate_user_stats, invalidate_achievement_catalog
 )
-from auth import get_password_hash, verify_password, create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
-from dependencies import get_current_user, get_current_admin
+from auth import (
+    get_password_hash_async, verify_password_async, password_needs_rehash, password_hashing,
+    create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
+)
+from dependencies import get_current_user, get_current_user_async, get_current_admin
+from principals import UserPrincipal, invalidate_user_principal
 from datetime import timedelta
 
 Base.metadata.create_all(bind=engine)
@@ -45,6 +66,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+def start_analysis_pool():
+    # Spawn and warm the audio analysis workers before the first request
+    warm_pool()
+
+@app.on_event("shutdown")
+def stop_analysis_pool():
+    shutdown_pool()
+    shutdown_transcode_pool()
+
+@app.on_event("shutdown")
+async def close_async_engines():
+    await dispose_async_engines()
+
 @app.get("/")
 def read_root():
     return {"message": "Talk2Me API is running"}
@@ -53,21 +88,32 @@ def read_root():
 def health_check():
     return {"status": "ok"}
 
-@app.get("/uploads/{filename}")
-def get_audio_file(filename: str):
-    """Serve audio files from the uploads directory"""
-    file_path = os.path.join("uploads", filename)
-    if not os.path.exists(file_path):
+@app.api_route("/uploads/{filename}", methods=["GET", "HEAD"])
+def get_audio_file(filename: str, request: Request):
+    """
+    Serve audio files from the uploads directory (or the cold tier). Stored
+    names are unique and a file's bytes never change (transcoding writes a
+    new name), so responses are cacheable forever and support Range requests
+    for seeking.
+    """
+    file_path = resolve_upload(filename)
+    if not file_path:
         raise HTTPException(status_code=404, detail="Audio file not found")
-    return FileResponse(file_path, media_type="audio/webm")
+    offload_headers = None
+    if AUDIO_SENDFILE_MODE == "x-accel":
+        prefix = AUDIO_COLD_ACCEL_PREFIX if is_cold(file_path) else AUDIO_ACCEL_PREFIX
+        offload_headers = {"X-Accel-Redirect": prefix.rstrip("/") + "/" + os.path.basename(file_path)}
+    elif AUDIO_SENDFILE_MODE == "x-sendfile":
+        offload_headers = {"X-Sendfile": file_path}
+    return file_response(request, file_path, audio_media_type(file_path), AUDIO_CACHE_CONTROL, offload_headers)
 
 # Auth endpoints
 @app.post("/auth/signup", response_model=Token)
-def signup(user_data: UserSignup, db: Session = Depends(get_db)):
+async def signup(user_data: UserSignup, db: AsyncSession = Depends(get_async_db)):
     # Check if user exists
-    existing_user = db.query(User).filter(
+    existing_user = (await db.execute(select(User).where(
         (User.email == user_data.email) | (User.username == user_data.username)
-    ).first()
+    ))).scalars().first()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -75,7 +121,7 @@ def signup(user_data: UserSignup, db: Session = Depends(get_db)):
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     new_user = User(
         username=user_data.username,
         email=user_data.email,
@@ -83,11 +129,11 @@ def signup(user_data: UserSignup, db: Session = Depends(get_db)):
         is_superadmin=False
     )
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     
     # Unlock "Hello Speaker" achievement
-    unlock_hello_speaker(db, new_user.id)
+    await db.run_sync(unlock_hello_speaker, new_user.id)
     
     # Create access token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -108,15 +154,23 @@ def signup(user_data: UserSignup, db: Session = Depends(get_db)):
     }
 
 @app.post("/auth/login", response_model=Token)
-def login(user_data: UserLogin, db: Session = Depends(get_db)):
+async def login(user_data: UserLogin, db: AsyncSession = Depends(get_async_db)):
     # Find user
-    user = db.query(User).filter(User.email == user_data.email).first()
-    if not user or not verify_password(user_data.password, user.hashed_password):
+    user = (await db.execute(select(User).where(User.email == user_data.email))).scalars().first()
+    if not user or not user.hashed_password or not await verify_password_async(user_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+    # Upgrade hashes made with an older BCRYPT_ROUNDS while we have the password
+    if password_needs_rehash(user.hashed_password):
+        try:
+            user.hashed_password = await get_password_hash_async(user_data.password)
+            await db.commit()
+        except HTTPException:
+            pass  # Hashing pool saturated; upgrade on a later login
     
     # Create access token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -267,14 +321,14 @@ def github_auth(auth_request: GitHubAuthRequest, db: Session = Depends(get_db)):
     }
 
 @app.get("/auth/me", response_model=UserResponse)
-def get_me(current_user: User = Depends(get_current_user)):
+async def get_me(current_user: UserPrincipal = Depends(get_current_user_async)):
     return current_user
 
 @app.put("/users/me", response_model=UserResponse)
 def update_my_profile(
     user_update: UserUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     updated_user = update_user(db, current_user.id, user_update)
     return updated_user
@@ -283,20 +337,24 @@ def update_my_profile(
 def complete_onboarding(
     onboarding_data: OnboardingUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
-    current_user.onboarding_data = onboarding_data.onboarding_data
-    current_user.onboarding_completed = True
+    user = get_user_by_id(db, current_user.id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    user.onboarding_data = onboarding_data.onboarding_data
+    user.onboarding_completed = True
     db.commit()
-    db.refresh(current_user)
-    return current_user
+    invalidate_user_principal(user.id)
+    db.refresh(user)
+    return user
 
 @app.put("/admin/users/{user_id}", response_model=UserResponse)
 def admin_update_user(
     user_id: int,
     user_data: UserUpdate,
     db: Session = Depends(get_db),
-    current_admin: User = Depends(get_current_admin)
+    current_admin: UserPrincipal = Depends(get_current_admin)
 ):
     updated_user = update_user(db, user_id, user_data)
     if not updated_user:
@@ -304,15 +362,15 @@ def admin_update_user(
     return updated_user
 
 @app.post("/admin/users", response_model=UserResponse)
-def admin_create_user(
+async def admin_create_user(
     user_data: UserSignup,
-    db: Session = Depends(get_db),
-    current_admin: User = Depends(get_current_admin)
+    db: AsyncSession = Depends(get_async_db),
+    current_admin: UserPrincipal = Depends(get_current_admin)
 ):
     # Check if user exists
-    existing_user = db.query(User).filter(
+    existing_user = (await db.execute(select(User).where(
         (User.email == user_data.email) | (User.username == user_data.username)
-    ).first()
+    ))).scalars().first()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -320,7 +378,7 @@ def admin_create_user(
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     new_user = User(
         username=user_data.username,
         email=user_data.email,
@@ -328,24 +386,24 @@ def admin_create_user(
         is_superadmin=False
     )
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     return new_user
 
 @app.get("/topics", response_model=List[Topic])
-def read_topics(db: Session = Depends(get_db)):
+async def read_topics(db: AsyncSession = Depends(get_async_read_db)):
     # Exclude custom topics from public listing
-    return get_all_topics(db, include_custom=False)
+    return await get_all_topics_async(db, include_custom=False)
 
 @app.post("/topics", response_model=Topic)
-def add_topic(topic: TopicCreate, db: Session = Depends(get_db), current_admin: User = Depends(get_current_admin)):
+def add_topic(topic: TopicCreate, db: Session = Depends(get_db), current_admin: UserPrincipal = Depends(get_current_admin)):
     return create_topic(db, topic)
 
 @app.post("/topics/custom", response_model=Topic)
 def add_custom_topic(
     topic_data: CustomTopicCreate, 
     db: Session = Depends(get_db), 
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """Create a custom topic by a user"""
     return create_custom_topic(
@@ -357,7 +415,7 @@ def add_custom_topic(
     )
 
 @app.get("/topics/{topic_id}", response_model=Topic)
-def read_topic(topic_id: int, db: Session = Depends(get_db)):
+def read_topic(topic_id: int, db: Session = Depends(get_read_db)):
     return get_topic_by_id(db, topic_id)
 
 @app.put("/topics/{topic_id}", response_model=Topic)
@@ -365,7 +423,7 @@ def edit_topic(
     topic_id: int, 
     topic: TopicCreate, 
     db: Session = Depends(get_db), 
-    current_admin: User = Depends(get_current_admin)
+    current_admin: UserPrincipal = Depends(get_current_admin)
 ):
     """Update an existing topic"""
     updated_topic = update_topic(db, topic_id, topic)
@@ -374,7 +432,7 @@ def edit_topic(
     return updated_topic
 
 @app.delete("/topics/{topic_id}")
-def remove_topic(topic_id: int, db: Session = Depends(get_db), current_admin: User = Depends(get_current_admin)):
+def remove_topic(topic_id: int, db: Session = Depends(get_db), current_admin: UserPrincipal = Depends(get_current_admin)):
     success = delete_topic(db, topic_id)
     if not success:
         return {"error": "Topic not found"}
@@ -391,33 +449,70 @@ async def analyze_speech(
     
     # Check and unlock achievements after attempt
     if user_id:
-        newly_unlocked = check_and_unlock_achievements(db, user_id)
+        newly_unlocked = check_and_unlock_achievements(db, user_id, event="attempt_created")
         result["newly_unlocked_achievements"] = newly_unlocked
+
+    # Shrink the stored recording on the bounded transcode pool
+    if result.get("id"):
+        schedule_transcode(result["id"])
     
     return result
 
+@app.post("/analyze/jobs", response_model=AnalysisJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_analysis_job(
+    audio: UploadFile = File(...),
+    topic_id: int = Form(...),
+    db: Session = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user)
+):
+    """
+    Queue a recording for background analysis; poll GET /analyze/jobs/{id}
+    for the result. The job belongs to the signed-in user.
+    """
+    ingested = await ingest_upload(audio)
+    try:
+        job_id = new_job_id()
+        stage_for_job(ingested, job_id)
+        return create_job(db, job_id, topic_id, current_user.id, ingested.path, ingested.sha256, ingested.size)
+    except Exception:
+        discard(ingested)
+        raise
+
+@app.get("/analyze/jobs/{job_id}", response_model=AnalysisJobResponse)
+def read_analysis_job(job_id: str, db: Session = Depends(get_db), current_user: UserPrincipal = Depends(get_current_user)):
+    job = get_job(db, job_id)
+    # Other users' jobs look the same as missing ones
+    if not job or (job.user_id != current_user.id and not current_user.is_superadmin):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
 @app.get("/leaderboard", response_model=List[dict])
-def read_leaderboard(type: str = "top", db: Session = Depends(get_db)):
-    return get_leaderboard(db, leaderboard_type=type)
+async def read_leaderboard(request: Request, type: str = "top", db: AsyncSession = Depends(get_async_read_db)):
+    body, etag = await get_leaderboard_response_async(db, leaderboard_type=type)
+    # no-cache: browsers may store it but must revalidate (cheap 304s)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 # Category endpoints
 @app.get("/categories", response_model=List[Category])
-def read_categories(db: Session = Depends(get_db)):
-    return get_all_categories(db)
+async def read_categories(db: AsyncSession = Depends(get_async_read_db)):
+    return await get_all_categories_async(db)
 
 @app.post("/categories", response_model=Category)
-def add_category(category: CategoryCreate, db: Session = Depends(get_db), current_admin: User = Depends(get_current_admin)):
+def add_category(category: CategoryCreate, db: Session = Depends(get_db), current_admin: UserPrincipal = Depends(get_current_admin)):
     return create_category(db, category)
 
 @app.put("/categories/{category_id}", response_model=Category)
-def modify_category(category_id: int, category: CategoryUpdate, db: Session = Depends(get_db), current_admin: User = Depends(get_current_admin)):
+def modify_category(category_id: int, category: CategoryUpdate, db: Session = Depends(get_db), current_admin: UserPrincipal = Depends(get_current_admin)):
     result = update_category(db, category_id, category)
     if not result:
         raise HTTPException(status_code=404, detail="Category not found")
     return result
 
 @app.delete("/categories/{category_id}")
-def remove_category(category_id: int, db: Session = Depends(get_db), current_admin: User = Depends(get_current_admin)):
+def remove_category(category_id: int, db: Session = Depends(get_db), current_admin: UserPrincipal = Depends(get_current_admin)):
     result = delete_category(db, category_id)
     if result is None:
         raise HTTPException(status_code=404, detail="Category not found")
@@ -427,52 +522,100 @@ def remove_category(category_id: int, db: Session = Depends(get_db), current_adm
 
 # Admin Topics endpoint (includes custom topics)
 @app.get("/admin/topics/all", response_model=List[Topic])
-def read_all_topics_admin(db: Session = Depends(get_db), current_admin: User = Depends(get_current_admin)):
+def read_all_topics_admin(db: Session = Depends(get_read_db), current_admin: UserPrincipal = Depends(get_current_admin)):
     """Get all topics including custom ones for admin panel"""
     return get_all_topics(db, include_custom=True)
 
 # User management endpoints
-@app.get("/admin/users", response_model=List[UserResponse])
-def read_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db), current_admin: User = Depends(get_current_admin)):
-    return get_all_users(db, skip, limit)
+@app.get("/admin/users", response_model=UserPage)
+def read_users(cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE, db: Session = Depends(get_read_db), current_admin: UserPrincipal = Depends(get_current_admin)):
+    return get_all_users(db, cursor, limit)
 
 @app.put("/admin/users/{user_id}", response_model=UserResponse)
-def modify_user(user_id: int, user_update: UserUpdate, db: Session = Depends(get_db), current_admin: User = Depends(get_current_admin)):
+def modify_user(user_id: int, user_update: UserUpdate, db: Session = Depends(get_db), current_admin: UserPrincipal = Depends(get_current_admin)):
     result = update_user(db, user_id, user_update)
     if not result:
         raise HTTPException(status_code=404, detail="User not found")
     return result
 
 @app.delete("/admin/users/{user_id}")
-def remove_user(user_id: int, db: Session = Depends(get_db), current_admin: User = Depends(get_current_admin)):
+def remove_user(user_id: int, db: Session = Depends(get_db), current_admin: UserPrincipal = Depends(get_current_admin)):
     result = delete_user(db, user_id)
     if not result:
         raise HTTPException(status_code=404, detail="User not found")
     return {"message": "User deleted"}
 
 @app.post("/admin/users/{user_id}/toggle-admin", response_model=UserResponse)
-def toggle_user_admin(user_id: int, db: Session = Depends(get_db), current_admin: User = Depends(get_current_admin)):
+def toggle_user_admin(user_id: int, db: Session = Depends(get_db), current_admin: UserPrincipal = Depends(get_current_admin)):
     result = toggle_admin_status(db, user_id)
     if not result:
         raise HTTPException(status_code=404, detail="User not found")
     return result
 
 # Attempts endpoints
-@app.get("/users/me/attempts", response_model=List[AttemptResponse])
-def read_my_attempts(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    return get_attempts_by_user(db, current_user.id)
+@app.get("/users/me/attempts", response_model=Union[AttemptPage, AttemptSummaryPage])
+async def read_my_attempts(
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    view: str = "full",
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserPrincipal = Depends(get_current_user_async)
+):
+    """
+    view=summary returns score, WPM, date and topic per attempt without the
+    transcript and feedback; fetch those from /users/me/attempts/{id}.
+    """
+    if view == "summary":
+        page = await get_attempt_summaries_by_user_async(db, current_user.id, cursor, limit)
+        return AttemptSummaryPage(**page)
+    if view != "full":
+        raise HTTPException(status_code=400, detail="view must be 'full' or 'summary'")
+    return await get_attempts_by_user_async(db, current_user.id, cursor, limit)
+
+@app.get("/users/me/attempts/{attempt_id}", response_model=AttemptResponse)
+async def read_my_attempt(
+    attempt_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserPrincipal = Depends(get_current_user_async)
+):
+    attempt = await get_attempt_for_user_async(db, current_user.id, attempt_id)
+    if not attempt:
+        raise HTTPException(status_code=404, detail="Attempt not found")
+    return attempt
 
-@app.get("/admin/attempts", response_model=List[AttemptResponse])
-def read_attempts(skip: int = 0, limit: int = 100, db: Session = Depends(get_db), current_admin: User = Depends(get_current_admin)):
-    return get_all_attempts(db, skip, limit)
+@app.get("/admin/attempts", response_model=AttemptPage)
+def read_attempts(cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE, db: Session = Depends(get_read_db), current_admin: UserPrincipal = Depends(get_current_admin)):
+    return get_all_attempts(db, cursor, limit)
 
 @app.delete("/admin/attempts/{attempt_id}")
-def remove_attempt(attempt_id: int, db: Session = Depends(get_db), current_admin: User = Depends(get_current_admin)):
+def remove_attempt(attempt_id: int, db: Session = Depends(get_db), current_admin: UserPrincipal = Depends(get_current_admin)):
     result = delete_attempt(db, attempt_id)
     if not result:
         raise HTTPException(status_code=404, detail="Attempt not found")
     return {"message": "Attempt deleted"}
 
+@app.get("/admin/cache/stats")
+def read_cache_stats(current_admin: UserPrincipal = Depends(get_current_admin)):
+    """Hit/miss counters for the in-process caches."""
+    return {
+        "transcription": transcript_cache.stats(),
+        "feedback": feedback_cache.stats()
+    }
+
+@app.get("/admin/auth/hashing/stats")
+def read_password_hashing_stats(current_admin: UserPrincipal = Depends(get_current_admin)):
+    """Queue depth, wait/run times and rejections for the password hashing pool."""
+    return password_hashing.stats()
+
+@app.post("/admin/achievements/reload")
+def reload_achievement_catalog(current_admin: UserPrincipal = Depends(get_current_admin)):
+    """
+    Drop this process's cached achievement catalog, e.g. after running
+    migrate_achievements.py. Other processes reload within ACHIEVEMENT_CATALOG_TTL.
+    """
+    invalidate_achievement_catalog()
+    return {"message": "Achievement catalog reloaded"}
+
 # Contact Message endpoints
 @app.post("/contact", response_model=ContactMessageResponse)
 def submit_contact(contact_data: ContactMessageCreate, db: Session = Depends(get_db)):
@@ -484,18 +627,23 @@ def submit_contact(contact_data: ContactMessageCreate, db: Session = Depends(get
         contact_data.message
     )
 
-@app.get("/admin/contacts", response_model=List[ContactMessageResponse])
-def read_contacts(skip: int = 0, limit: int = 100, db: Session = Depends(get_db), current_admin: User = Depends(get_current_admin)):
-    return get_all_contact_messages(db, skip, limit)
+@app.get("/admin/contacts", response_model=ContactMessagePage)
+def read_contacts(cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE, db: Session = Depends(get_read_db), current_admin: UserPrincipal = Depends(get_current_admin)):
+    return get_all_contact_messages(db, cursor, limit)
 
 # Achievement endpoints
 @app.get("/users/me/achievements")
-def get_my_achievements(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def get_my_achievements(db: AsyncSession = Depends(get_async_db), current_user: UserPrincipal = Depends(get_current_user_async)):
     """Get all achievements with unlock status for the current user."""
-    return get_user_achievements(db, current_user.id)
+    return await get_user_achievements_async(db, current_user.id)
+
+@app.get("/users/me/stats")
+def get_my_stats(db: Session = Depends(get_db), current_user: UserPrincipal = Depends(get_current_user)):
+    """Attempt totals, per-difficulty counts and streaks for the current user."""
+    return calculate_user_stats(db, current_user.id)
 
 @app.post("/users/me/achievements/check")
-def check_my_achievements(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def check_my_achievements(db: Session = Depends(get_db), current_user: UserPrincipal = Depends(get_current_user)):
     """Manually check and unlock achievements for the current user."""
     newly_unlocked = check_and_unlock_achievements(db, current_user.id)
     return {"newly_unlocked": newly_unlocked}
@@ -0,0 +1,30 @@
+"""
+Migration script to add the query indexes declared in models.py to an
+existing database. Safe to run more than once.
+"""
+from sqlalchemy import inspect
+from database import engine
+from models import Attempt, Topic, User, ContactMessage
+
+def main():
+    inspector = inspect(engine)
+    for model in (Attempt, Topic, User, ContactMessage):
+        table = model.__table__
+        existing = {ix["name"] for ix in inspector.get_indexes(table.name)}
+        for index in sorted(table.indexes, key=lambda ix: ix.name):
+            if index.name in existing:
+                print(f"⚠️  Index '{index.name}' already exists.")
+                continue
+            try:
+                index.create(bind=engine)
+                print(f"✅ Created index '{index.name}' on '{table.name}'.")
+            except Exception as e:
+                print(f"❌ Error creating index '{index.name}': {e}")
+
+    # Refresh planner statistics so the new indexes get picked up
+    with engine.begin() as conn:
+        conn.exec_driver_sql("ANALYZE")
+    print("\nMigration completed!")
+
+if __name__ == "__main__":
+    main()
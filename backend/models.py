@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, JSON, DateTime, ForeignKey, Float, Boolean, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Text, JSON, DateTime, Date, ForeignKey, Float, Boolean, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
@@ -21,6 +21,9 @@ class User(Base):
     attempts = relationship("Attempt", back_populates="user")
     user_achievements = relationship("UserAchievement", back_populates="user")
 
+    # Admin listing, newest first (keyset pagination)
+    __table_args__ = (Index('ix_users_created', 'created_at', 'id'),)
+
 class Category(Base):
     __tablename__ = "categories"
     
@@ -40,7 +43,7 @@ class Topic(Base):
     difficulty = Column(String) # Easy, Medium, Hard, Custom
     description = Column(Text, nullable=True)
     time_limit = Column(Integer, default=60)  # Time limit in seconds
-    is_custom = Column(Boolean, default=False)  # Flag for user-created topics
+    is_custom = Column(Boolean, default=False, index=True)  # Flag for user-created topics
     created_by = Column(Integer, ForeignKey("users.id"), nullable=True)  # User who created it
     
     category = relationship("Category", back_populates="topics")
@@ -52,7 +55,7 @@ class Attempt(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
-    topic_id = Column(Integer, ForeignKey("topics.id"))
+    topic_id = Column(Integer, ForeignKey("topics.id"), index=True)
     audio_url = Column(String, nullable=True)
     transcript = Column(Text, nullable=True)
     
@@ -67,6 +70,51 @@ class Attempt(Base):
     user = relationship("User", back_populates="attempts")
     topic = relationship("Topic", back_populates="attempts")
 
+    __table_args__ = (
+        # A user's attempts, newest first (profile, stats refresh)
+        Index('ix_attempts_user_created', 'user_id', 'created_at', 'id'),
+        # Admin listing, newest first (keyset pagination)
+        Index('ix_attempts_created', 'created_at', 'id'),
+        # Highest scores first, ties by id (leaderboard refill)
+        Index('ix_attempts_score', score.desc(), id),
+    )
+
+class LeaderboardEntry(Base):
+    """Top attempts by score, maintained on attempt insert/delete (read model for /leaderboard?type=top)."""
+    __tablename__ = "leaderboard_top"
+
+    attempt_id = Column(Integer, ForeignKey("attempts.id"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    topic_id = Column(Integer, ForeignKey("topics.id"), nullable=True)
+    score = Column(Integer, nullable=False)
+    created_at = Column(DateTime)
+
+    __table_args__ = (Index('ix_leaderboard_top_score', 'score', 'attempt_id'),)
+
+class UserScoreSummary(Base):
+    """Per-user running score totals (read model for /leaderboard?type=average)."""
+    __tablename__ = "leaderboard_user_scores"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    attempt_count = Column(Integer, nullable=False, default=0)
+    scored_count = Column(Integer, nullable=False, default=0)  # Attempts with a score; AVG ignores NULLs
+    score_sum = Column(Integer, nullable=False, default=0)
+    average_score = Column(Float, nullable=True, index=True)
+
+class UserStats(Base):
+    """Per-user attempt statistics, updated in O(1) per new attempt (achievements, profile)."""
+    __tablename__ = "user_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    total_attempts = Column(Integer, nullable=False, default=0)
+    easy_count = Column(Integer, nullable=False, default=0)
+    medium_count = Column(Integer, nullable=False, default=0)
+    hard_count = Column(Integer, nullable=False, default=0)
+    current_streak = Column(Integer, nullable=False, default=0)  # Run of consecutive days ending at last_attempt_date
+    longest_streak = Column(Integer, nullable=False, default=0)
+    last_attempt_date = Column(Date, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 class ContactMessage(Base):
     __tablename__ = "contact_messages"
 
@@ -77,6 +125,9 @@ class ContactMessage(Base):
     message = Column(Text, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    # Admin listing, newest first (keyset pagination)
+    __table_args__ = (Index('ix_contact_messages_created', 'created_at', 'id'),)
+
 class Achievement(Base):
     __tablename__ = "achievements"
     
@@ -102,4 +153,31 @@ class UserAchievement(Base):
     user = relationship("User", back_populates="user_achievements")
     achievement = relationship("Achievement", back_populates="user_achievements")
     
+    # Leads with user_id, so it also serves "achievements of this user" lookups
     __table_args__ = (UniqueConstraint('user_id', 'achievement_id', name='_user_achievement_uc'),)
+
+class AnalysisJob(Base):
+    __tablename__ = "analysis_jobs"
+
+    id = Column(String, primary_key=True, index=True)  # uuid4 hex, returned to the client
+    status = Column(String, nullable=False, default="queued")  # queued, running, succeeded, failed
+    topic_id = Column(Integer, ForeignKey("topics.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+
+    # Recording staged in shared storage until a worker finishes with it
+    audio_path = Column(String, nullable=False)
+    audio_sha256 = Column(String, nullable=True)
+    audio_size = Column(Integer, nullable=True)
+
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, default=0)  # Leases taken so far
+
+    # Lease held by the worker currently running the job
+    lease_owner = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (Index('ix_analysis_jobs_status_created', 'status', 'created_at'),)
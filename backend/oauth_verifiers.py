@@ -0,0 +1,241 @@
+"""
+Google and GitHub sign-in verification backends.
+
+Every backend implements the OAuthVerifier protocol and registers itself
+under a name; OAUTH_VERIFIER picks one (default "live"). The "stub" backend
+answers locally so /auth/google and /auth/github can be load tested without
+the network. It accepts any token, so never enable it on a public server.
+
+The live backend shares one pooled requests.Session with timeouts for all
+provider calls, caches Google's signing certificates for the lifetime
+Google advertises (Cache-Control max-age) and only asks GitHub for a user's
+email list when their profile email isn't public.
+"""
+import os
+import re
+import time
+import logging
+import threading
+from typing import Optional, Protocol
+import requests
+from requests.adapters import HTTPAdapter
+from google.oauth2 import id_token
+from google.auth.transport import requests as google_requests
+from dotenv import load_dotenv
+from cache import LRUCache
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
+GITHUB_CLIENT_ID = os.getenv("GITHUB_CLIENT_ID")
+GITHUB_CLIENT_SECRET = os.getenv("GITHUB_CLIENT_SECRET")
+
+OAUTH_HTTP_TIMEOUT = float(os.getenv("OAUTH_HTTP_TIMEOUT_SECONDS", "10"))
+OAUTH_HTTP_POOL_SIZE = int(os.getenv("OAUTH_HTTP_POOL_SIZE", "20"))
+
+class OAuthVerifier(Protocol):
+    name: str
+
+    def verify_google_token(self, token: str) -> Optional[dict]:
+        ...
+
+    def verify_github_code(self, code: str) -> Optional[dict]:
+        ...
+
+OAUTH_VERIFIERS = {}
+_instances = {}
+_instances_lock = threading.Lock()
+
+def register_oauth_verifier(name: str):
+    def register(cls):
+        cls.name = name
+        OAUTH_VERIFIERS[name] = cls
+        return cls
+    return register
+
+def get_oauth_verifier(name: str = None) -> OAuthVerifier:
+    """Returns the (shared) instance of the named or configured backend."""
+    name = name or os.getenv("OAUTH_VERIFIER", "live")
+    if name not in OAUTH_VERIFIERS:
+        raise ValueError(f"Unknown OAuth verifier '{name}'. Available: {', '.join(sorted(OAUTH_VERIFIERS))}")
+    with _instances_lock:
+        if name not in _instances:
+            _instances[name] = OAUTH_VERIFIERS[name]()
+        return _instances[name]
+
+def make_http_session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=OAUTH_HTTP_POOL_SIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+class CachingGoogleRequest(google_requests.Request):
+    """
+    google-auth transport that keeps successful GET responses (the signing
+    certificates) for their Cache-Control max-age instead of refetching them
+    on every verification.
+    """
+    def __init__(self, session: requests.Session):
+        super().__init__(session=session)
+        self._responses = LRUCache(maxsize=16)
+
+    def __call__(self, url, method="GET", body=None, headers=None, timeout=None, **kwargs):
+        timeout = timeout or OAUTH_HTTP_TIMEOUT
+        if method != "GET" or body is not None:
+            return super().__call__(url, method=method, body=body, headers=headers, timeout=timeout, **kwargs)
+        response = self._responses.get(url)
+        if response is None:
+            response = super().__call__(url, method=method, headers=headers, timeout=timeout, **kwargs)
+            match = _MAX_AGE_RE.search(response.headers.get("cache-control", ""))
+            if response.status == 200 and match and int(match.group(1)) > 0:
+                self._responses.set(url, response, ttl=int(match.group(1)))
+        return response
+
+class BaseOAuthVerifier:
+    name = "base"
+
+    def verify_google_token(self, token: str) -> Optional[dict]:
+        raise NotImplementedError
+
+    def verify_github_code(self, code: str) -> Optional[dict]:
+        raise NotImplementedError
+
+@register_oauth_verifier("live")
+class LiveOAuthVerifier(BaseOAuthVerifier):
+    """Verifies against Google's and GitHub's APIs."""
+
+    def __init__(self):
+        self.session = make_http_session()
+        self.google_request = CachingGoogleRequest(self.session)
+
+    def verify_google_token(self, token: str) -> Optional[dict]:
+        try:
+            # Try to verify as ID token
+            logger.info("Attempting to verify as ID token")
+            idinfo = id_token.verify_oauth2_token(token, self.google_request, GOOGLE_CLIENT_ID)
+            logger.info(f"ID token verified successfully: {idinfo}")
+            return idinfo
+        except ValueError as e:
+            logger.warning(f"ID token verification failed: {e}")
+        # If that fails, try to verify as access token
+        try:
+            logger.info("Attempting to verify as access token")
+            response = self.session.get(
+                'https://www.googleapis.com/oauth2/v3/userinfo',
+                headers={'Authorization': f'Bearer {token}'},
+                timeout=OAUTH_HTTP_TIMEOUT
+            )
+            logger.info(f"Access token verification response status: {response.status_code}")
+            if response.status_code == 200:
+                user_info = response.json()
+                logger.info(f"Access token verified successfully: {user_info}")
+                return user_info
+            logger.error(f"Access token verification failed with status {response.status_code}: {response.text}")
+            return None
+        except Exception as e:
+            logger.error(f"Exception during access token verification: {e}")
+            return None
+
+    def _github_get(self, url: str, access_token: str):
+        return self.session.get(
+            url,
+            headers={
+                'Authorization': f'Bearer {access_token}',
+                'Accept': 'application/json'
+            },
+            timeout=OAUTH_HTTP_TIMEOUT
+        )
+
+    def verify_github_code(self, code: str) -> Optional[dict]:
+        try:
+            # Exchange code for access token
+            logger.info(f"Exchanging GitHub code for access token: {code[:10]}...")
+            token_response = self.session.post(
+                'https://github.com/login/oauth/access_token',
+                headers={'Accept': 'application/json'},
+                data={
+                    'client_id': GITHUB_CLIENT_ID,
+                    'client_secret': GITHUB_CLIENT_SECRET,
+                    'code': code
+                },
+                timeout=OAUTH_HTTP_TIMEOUT
+            )
+
+            logger.info(f"Token exchange response status: {token_response.status_code}")
+
+            if token_response.status_code != 200:
+                logger.error(f"Failed to exchange code: {token_response.text}")
+                return None
+
+            token_data = token_response.json()
+
+            # Check for error in response
+            if 'error' in token_data:
+                logger.error(f"GitHub returned error: {token_data}")
+                return None
+
+            access_token = token_data.get('access_token')
+
+            if not access_token:
+                logger.error(f"No access token in response: {token_data}")
+                return None
+
+            # Get user info
+            logger.info("Fetching GitHub user info")
+            user_response = self._github_get('https://api.github.com/user', access_token)
+
+            logger.info(f"User info response status: {user_response.status_code}")
+
+            if user_response.status_code != 200:
+                logger.error(f"Failed to get user info: {user_response.text}")
+                return None
+
+            user_data = user_response.json()
+            logger.info(f"Got user data: {user_data.get('login')}")
+
+            # Get user email if not public (one extra API call only then)
+            if not user_data.get('email'):
+                email_response = self._github_get('https://api.github.com/user/emails', access_token)
+                if email_response.status_code == 200:
+                    emails = email_response.json()
+                    logger.info(f"Got emails: {emails}")
+                    primary_email = next((e for e in emails if e.get('primary')), None)
+                    if primary_email:
+                        user_data['email'] = primary_email['email']
+
+            logger.info(f"GitHub user verified: {user_data.get('login')} with email: {user_data.get('email')}")
+            return user_data
+
+        except Exception as e:
+            logger.error(f"Exception during GitHub verification: {e}", exc_info=True)
+            return None
+
+@register_oauth_verifier("stub")
+class StubOAuthVerifier(BaseOAuthVerifier):
+    """
+    Offline stand-in for benchmarks. A Google token or GitHub code is taken
+    as the user's identity ("alice" -> alice@example.com); latency is set
+    with STUB_OAUTH_LATENCY_MS.
+    """
+
+    def __init__(self):
+        self.latency = float(os.getenv("STUB_OAUTH_LATENCY_MS", "0")) / 1000
+        logger.warning("OAuth verification is stubbed (OAUTH_VERIFIER=stub): any token is accepted")
+
+    def _identity(self, value: str) -> str:
+        if self.latency:
+            time.sleep(self.latency)
+        return value if "@" in value else f"{value}@example.com"
+
+    def verify_google_token(self, token: str) -> Optional[dict]:
+        email = self._identity(token)
+        return {"email": email, "name": email.split("@")[0], "email_verified": True}
+
+    def verify_github_code(self, code: str) -> Optional[dict]:
+        email = self._identity(code)
+        return {"login": email.split("@")[0], "email": email}
@@ -0,0 +1,58 @@
+"""
+Keyset (cursor) pagination for listings ordered newest first.
+
+Rows are ordered by (created_at DESC, id DESC); id breaks ties between rows
+created in the same instant, so the order is total and stable while rows are
+being inserted. The cursor is the sort key of the last row on a page, encoded
+as an opaque URL-safe string, and the next page is everything strictly after
+it, which an index on (created_at, id) serves without skipping rows the way
+OFFSET does.
+"""
+import base64
+import json
+from datetime import datetime
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str):
+    """Returns (created_at, id); raises a 400 for anything that isn't one of our cursors."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def clamp_page_size(limit: int) -> int:
+    return max(1, min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE))
+
+def keyset_page(stmt, model, cursor: str = None, limit: int = DEFAULT_PAGE_SIZE):
+    """
+    Orders a select() on `model` newest first and restricts it to the page
+    after `cursor`. Fetches one extra row so page_result() can tell whether
+    another page follows.
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        stmt = stmt.where(or_(
+            model.created_at < created_at,
+            and_(model.created_at == created_at, model.id < row_id)
+        ))
+    return stmt.order_by(model.created_at.desc(), model.id.desc()).limit(clamp_page_size(limit) + 1)
+
+def page_result(rows, limit: int = DEFAULT_PAGE_SIZE):
+    """Builds the {"items", "next_cursor"} envelope from keyset_page() rows."""
+    limit = clamp_page_size(limit)
+    items = list(rows[:limit])
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    return {"items": items, "next_cursor": next_cursor}
@@ -0,0 +1,45 @@
+"""
+The authenticated user as endpoints see it, and the per-process cache of
+those principals. Kept apart from dependencies.py (the HTTP auth layer) so
+the service functions that change users can drop cached copies directly.
+"""
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from models import User
+from cache import LRUCache
+
+@dataclass(frozen=True)
+class UserPrincipal:
+    """
+    The authenticated user as seen by endpoints: plain values, safe to cache
+    and share between requests. Load the ORM User by id to modify it.
+    """
+    id: int
+    username: str
+    email: str
+    is_superadmin: bool
+    created_at: datetime
+    onboarding_completed: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserPrincipal":
+        return cls(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            is_superadmin=bool(user.is_superadmin),
+            created_at=user.created_at,
+            onboarding_completed=bool(user.onboarding_completed)
+        )
+
+# Principals by user id. The TTL bounds how stale another process's copy can
+# get; this process drops entries as soon as the user changes
+principals = LRUCache(
+    maxsize=int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("PRINCIPAL_CACHE_TTL", "60"))
+)
+
+def invalidate_user_principal(user_id: int):
+    """Call after changing or deleting a user."""
+    principals.delete(user_id)
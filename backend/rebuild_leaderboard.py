@@ -0,0 +1,25 @@
+"""
+Rebuild the leaderboard read models (leaderboard_top, leaderboard_user_scores)
+from the attempts table. Run after deploying them, or after attempts were
+inserted outside the API (e.g. seed_attempts.py).
+"""
+from database import SessionLocal, engine
+from models import Base
+from services.leaderboard import rebuild_leaderboard
+
+def main():
+    print("Creating leaderboard tables...")
+    Base.metadata.create_all(bind=engine)
+
+    db = SessionLocal()
+    try:
+        result = rebuild_leaderboard(db)
+        print(f"✅ Rebuilt leaderboard: {result['users']} users, {result['top_entries']} top entries.")
+    except Exception as e:
+        print(f"❌ Error rebuilding leaderboard: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+"""
+Repair/backfill the user_stats table from the attempts table.
+Run after deploying it, or after attempts were inserted outside the API
+(e.g. seed_attempts.py). Rows missing at runtime are also filled lazily.
+"""
+from database import SessionLocal, engine
+from models import Base
+from services.achievements import rebuild_all_user_stats
+
+def main():
+    print("Creating user_stats table...")
+    Base.metadata.create_all(bind=engine)
+
+    db = SessionLocal()
+    try:
+        count = rebuild_all_user_stats(db)
+        print(f"✅ Rebuilt stats for {count} users.")
+    except Exception as e:
+        print(f"❌ Error rebuilding user stats: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -33,6 +33,10 @@ class UserResponse(UserBase):
     class Config:
         orm_mode = True
 
+class UserPage(BaseModel):
+    items: List[UserResponse]
+    next_cursor: Optional[str] = None
+
 class OnboardingUpdate(BaseModel):
     onboarding_data: dict
 
@@ -84,6 +88,28 @@ class AttemptResponse(AttemptBase):
     class Config:
         orm_mode = True
 
+class AttemptPage(BaseModel):
+    items: List[AttemptResponse]
+    next_cursor: Optional[str] = None
+
+class AttemptSummary(BaseModel):
+    """History-list row: no transcript, feedback or nested topic."""
+    id: int
+    topic_id: Optional[int]
+    topic_title: Optional[str] = None
+    topic_difficulty: Optional[str] = None
+    score: Optional[int]
+    wpm: Optional[float]
+    filler_count: Optional[int]
+    created_at: datetime
+
+    class Config:
+        orm_mode = True
+
+class AttemptSummaryPage(BaseModel):
+    items: List[AttemptSummary]
+    next_cursor: Optional[str] = None
+
 class CategoryBase(BaseModel):
     name: str
     description: Optional[str] = None
@@ -114,5 +140,21 @@ class ContactMessageResponse(ContactMessageCreate):
     class Config:
         orm_mode = True
 
+class ContactMessagePage(BaseModel):
+    items: List[ContactMessageResponse]
+    next_cursor: Optional[str] = None
+
+class AnalysisJobResponse(BaseModel):
+    id: str
+    status: str
+    topic_id: int
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
+
 # Update forward references
 Topic.update_forward_refs()
@@ -1,183 +1,348 @@
 """
 Service layer for achievement management.
 """
+from sqlalchemy import select, case, or_
 from sqlalchemy.orm import Session
-from models import Achievement, UserAchievement, Attempt, User
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
+from models import Achievement, UserAchievement, Attempt, User, Topic, UserStats
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
 import json
+import os
+import threading
+import time
 
 def get_all_achievements(db: Session):
     """Get all achievements."""
     return db.query(Achievement).all()
 
-def get_user_achievements(db: Session, user_id: int):
+# Events that can change the outcome of each rule type. Only rules indexed
+# under the event being processed are evaluated. Streaks only change when an
+# attempt is recorded, so they're indexed under attempt_created.
+ACHIEVEMENT_EVENTS = ("signup", "attempt_created")
+RULE_EVENTS = {
+    "login": ("signup",),
+    "total_attempts": ("attempt_created",),
+    "difficulty_count": ("attempt_created",),
+    "streak": ("attempt_created",),
+}
+
+ACHIEVEMENT_CATALOG_TTL = float(os.getenv("ACHIEVEMENT_CATALOG_TTL", "300"))
+
+def _compile_rule(condition: dict):
+    """Turn an unlock_condition into a predicate over the user's stats."""
+    rule_type = condition.get("type")
+    threshold = condition.get("threshold", 1)
+    if rule_type == "login":
+        return lambda stats: True  # User exists, so they've logged in
+    if rule_type == "total_attempts":
+        return lambda stats: stats["total_attempts"] >= threshold
+    if rule_type == "streak":
+        return lambda stats: stats["longest_streak"] >= threshold
+    if rule_type == "difficulty_count":
+        counter = f"{condition['difficulty'].lower()}_count"
+        return lambda stats: stats.get(counter, 0) >= threshold
+    return None
+
+@dataclass
+class CompiledAchievement:
+    id: int
+    info: dict  # Public fields returned to clients
+    condition: dict
+    predicate: Optional[Callable[[dict], bool]]
+    needs_stats: bool
+
+@dataclass
+class AchievementCatalog:
+    achievements: List[CompiledAchievement]
+    by_event: Dict[str, List[CompiledAchievement]]
+    loaded_at: float
+
+_catalog: Optional[AchievementCatalog] = None
+_catalog_lock = threading.Lock()
+
+def _fresh_catalog() -> Optional[AchievementCatalog]:
+    catalog = _catalog
+    if catalog is not None and time.monotonic() - catalog.loaded_at < ACHIEVEMENT_CATALOG_TTL:
+        return catalog
+    return None
+
+def get_achievement_catalog(db: Session) -> AchievementCatalog:
     """
-    Get all achievements with unlock status for a user.
-    Returns list of dicts with achievement data and unlock status.
+    The achievement catalog with conditions parsed and compiled once,
+    indexed by triggering event. Reloaded after ACHIEVEMENT_CATALOG_TTL
+    seconds or invalidate_achievement_catalog().
     """
-    achievements = db.query(Achievement).all()
-    user_unlocked = db.query(UserAchievement).filter(
-        UserAchievement.user_id == user_id
-    ).all()
-    
-    unlocked_achievement_ids = {ua.achievement_id for ua in user_unlocked}
-    unlocked_dict = {ua.achievement_id: ua.unlocked_at for ua in user_unlocked}
-    
+    global _catalog
+    catalog = _fresh_catalog()
+    if catalog is not None:
+        return catalog
+
+    with _catalog_lock:
+        compiled = []
+        for achievement in db.query(Achievement).order_by(Achievement.id).all():
+            condition = json.loads(achievement.unlock_condition) if isinstance(achievement.unlock_condition, str) else achievement.unlock_condition
+            compiled.append(CompiledAchievement(
+                id=achievement.id,
+                info={
+                    "id": achievement.id,
+                    "key": achievement.key,
+                    "title": achievement.title,
+                    "description": achievement.description,
+                    "icon_name": achievement.icon_name,
+                    "gradient": achievement.gradient
+                },
+                condition=condition,
+                predicate=_compile_rule(condition),
+                needs_stats=condition.get("type") != "login"
+            ))
+        by_event = {event: [] for event in ACHIEVEMENT_EVENTS}
+        for achievement in compiled:
+            for event in RULE_EVENTS.get(achievement.condition.get("type"), ()):
+                by_event[event].append(achievement)
+        _catalog = AchievementCatalog(compiled, by_event, time.monotonic())
+        return _catalog
+
+def invalidate_achievement_catalog():
+    """
+    Drop this process's catalog, e.g. after migrate_achievements.py changed
+    the achievements table. Other processes pick changes up within
+    ACHIEVEMENT_CATALOG_TTL.
+    """
+    global _catalog
+    _catalog = None
+
+def _with_unlock_status(catalog: AchievementCatalog, unlocked_dict: dict):
     result = []
-    for achievement in achievements:
-        is_unlocked = achievement.id in unlocked_achievement_ids
+    for achievement in catalog.achievements:
         result.append({
-            "id": achievement.id,
-            "key": achievement.key,
-            "title": achievement.title,
-            "description": achievement.description,
-            "icon_name": achievement.icon_name,
-            "gradient": achievement.gradient,
-            "unlocked": is_unlocked,
+            **achievement.info,
+            "unlocked": achievement.id in unlocked_dict,
             "unlocked_at": unlocked_dict.get(achievement.id),
-            "unlock_condition": json.loads(achievement.unlock_condition) if isinstance(achievement.unlock_condition, str) else achievement.unlock_condition
+            "unlock_condition": achievement.condition
         })
-    
     return result
 
-def calculate_user_stats(db: Session, user_id: int):
-    """Calculate user statistics for achievement checking."""
-    attempts = db.query(Attempt).filter(Attempt.user_id == user_id).all()
-    
-    if not attempts:
-        return {
-            "total_attempts": 0,
-            "easy_count": 0,
-            "medium_count": 0,
-            "hard_count": 0,
-            "current_streak": 0,
-            "longest_streak": 0
-        }
-    
-    # Count by difficulty
-    easy_count = sum(1 for a in attempts if a.topic and a.topic.difficulty and a.topic.difficulty.lower() == 'easy')
-    medium_count = sum(1 for a in attempts if a.topic and a.topic.difficulty and a.topic.difficulty.lower() == 'medium')
-    hard_count = sum(1 for a in attempts if a.topic and a.topic.difficulty and a.topic.difficulty.lower() == 'hard')
-    
+def get_user_achievements(db: Session, user_id: int):
+    """
+    Get all achievements with unlock status for a user.
+    Returns list of dicts with achievement data and unlock status.
+    """
+    catalog = get_achievement_catalog(db)
+    unlocked_dict = dict(db.query(UserAchievement.achievement_id, UserAchievement.unlocked_at).filter(
+        UserAchievement.user_id == user_id
+    ).all())
+    return _with_unlock_status(catalog, unlocked_dict)
+
+async def get_user_achievements_async(db: AsyncSession, user_id: int):
+    """get_user_achievements on an AsyncSession."""
+    catalog = _fresh_catalog()
+    if catalog is None:
+        # Rare (TTL expiry); reuse the sync loader on the async connection
+        catalog = await db.run_sync(get_achievement_catalog)
+    rows = await db.execute(
+        select(UserAchievement.achievement_id, UserAchievement.unlocked_at).where(UserAchievement.user_id == user_id)
+    )
+    return _with_unlock_status(catalog, dict(rows.all()))
+
+DIFFICULTY_COUNTERS = ("easy", "medium", "hard")
+
+def _stats_from_attempts(rows):
+    """
+    Compute stats from (created_at, difficulty) rows.
+    Used for first-time fill and repairs; the hot path is record_attempt_stats.
+    """
+    stats = {
+        "total_attempts": len(rows),
+        "easy_count": 0,
+        "medium_count": 0,
+        "hard_count": 0,
+        "current_streak": 0,
+        "longest_streak": 0,
+        "last_attempt_date": None
+    }
+    for _, difficulty in rows:
+        difficulty = (difficulty or "").lower()
+        if difficulty in DIFFICULTY_COUNTERS:
+            stats[f"{difficulty}_count"] += 1
+
     # Calculate streaks
-    sorted_dates = sorted(set(a.created_at.date() for a in attempts))
-    
-    current_streak = 0
-    longest_streak = 0
-    
+    sorted_dates = sorted(set(created_at.date() for created_at, _ in rows if created_at))
     if sorted_dates:
-        # Check current streak
-        today = datetime.utcnow().date()
-        yesterday = today - timedelta(days=1)
-        
-        if sorted_dates[-1] == today or sorted_dates[-1] == yesterday:
-            current_streak = 1
-            check_date = sorted_dates[-1] - timedelta(days=1)
-            
-            for i in range(len(sorted_dates) - 2, -1, -1):
-                if sorted_dates[i] == check_date:
-                    current_streak += 1
-                    check_date -= timedelta(days=1)
-                else:
-                    break
-        
-        # Calculate longest streak
         streak = 1
+        longest_streak = 1
         for i in range(1, len(sorted_dates)):
             if (sorted_dates[i] - sorted_dates[i-1]).days == 1:
                 streak += 1
                 longest_streak = max(longest_streak, streak)
             else:
                 streak = 1
-        longest_streak = max(longest_streak, streak)
-    
+        # Streak ending at the last attempt; the "current" streak is derived on read
+        stats["current_streak"] = streak
+        stats["longest_streak"] = longest_streak
+        stats["last_attempt_date"] = sorted_dates[-1]
+    return stats
+
+def refresh_user_stats(db: Session, user_id: int):
+    """Recompute a user's stats row from their attempts. Does not commit."""
+    rows = db.query(Attempt.created_at, Topic.difficulty).outerjoin(
+        Topic, Topic.id == Attempt.topic_id
+    ).filter(Attempt.user_id == user_id).all()
+    values = _stats_from_attempts(rows)
+
+    user_stats = db.query(UserStats).filter(UserStats.user_id == user_id).first()
+    if user_stats is None:
+        user_stats = UserStats(user_id=user_id)
+        db.add(user_stats)
+    for key, value in values.items():
+        setattr(user_stats, key, value)
+    return user_stats
+
+def record_attempt_stats(db: Session, attempt: Attempt):
+    """
+    Fold one newly inserted (flushed) attempt into the user's stats row in
+    O(1). Does not commit; the caller commits together with the attempt.
+
+    A single UPDATE computes every column from the row's current values, so
+    concurrent submissions for the same user serialize on the row instead of
+    overwriting each other's increments.
+    """
+    day = (attempt.created_at or datetime.utcnow()).date()
+    difficulty = db.query(Topic.difficulty).filter(Topic.id == attempt.topic_id).scalar()
+    difficulty = (difficulty or "").lower()
+
+    last = UserStats.last_attempt_date
+    # SET expressions see the old row: same or earlier day keeps the streak,
+    # the next day extends it, anything later starts a new one
+    new_streak = case(
+        (last.is_(None), 1),
+        (last == day - timedelta(days=1), UserStats.current_streak + 1),
+        (last < day, 1),
+        else_=UserStats.current_streak
+    )
+    values = {
+        UserStats.total_attempts: UserStats.total_attempts + 1,
+        UserStats.current_streak: new_streak,
+        UserStats.longest_streak: case(
+            (new_streak > UserStats.longest_streak, new_streak), else_=UserStats.longest_streak
+        ),
+        UserStats.last_attempt_date: case((or_(last.is_(None), last < day), day), else_=last),
+        UserStats.updated_at: datetime.utcnow()
+    }
+    if difficulty in DIFFICULTY_COUNTERS:
+        counter = getattr(UserStats, f"{difficulty}_count")
+        values[counter] = counter + 1
+
+    updated = db.query(UserStats).filter(UserStats.user_id == attempt.user_id).update(
+        values, synchronize_session=False
+    )
+    if not updated:
+        # No row yet (new user, or not backfilled): the recompute already
+        # includes the flushed attempt
+        refresh_user_stats(db, attempt.user_id)
+
+def rebuild_all_user_stats(db: Session):
+    """Recompute every user's stats row from the attempts table and commit."""
+    rows = db.query(Attempt.user_id, Attempt.created_at, Topic.difficulty).outerjoin(
+        Topic, Topic.id == Attempt.topic_id
+    ).filter(Attempt.user_id.isnot(None)).order_by(Attempt.user_id).all()
+
+    by_user = {}
+    for user_id, created_at, difficulty in rows:
+        by_user.setdefault(user_id, []).append((created_at, difficulty))
+
+    db.query(UserStats).delete(synchronize_session=False)
+    db.bulk_insert_mappings(UserStats, [
+        {"user_id": user_id, **_stats_from_attempts(user_rows)}
+        for user_id, user_rows in by_user.items()
+    ])
+    db.commit()
+    return len(by_user)
+
+def calculate_user_stats(db: Session, user_id: int):
+    """Calculate user statistics for achievement checking."""
+    user_stats = db.query(UserStats).filter(UserStats.user_id == user_id).first()
+    if user_stats is None:
+        user_stats = refresh_user_stats(db, user_id)
+        db.commit()
+
+    # Current streak only counts if the last attempt was today or yesterday
+    today = datetime.utcnow().date()
+    last = user_stats.last_attempt_date
+    current_streak = user_stats.current_streak if last and (today - last).days <= 1 else 0
+
     return {
-        "total_attempts": len(attempts),
-        "easy_count": easy_count,
-        "medium_count": medium_count,
-        "hard_count": hard_count,
+        "total_attempts": user_stats.total_attempts,
+        "easy_count": user_stats.easy_count,
+        "medium_count": user_stats.medium_count,
+        "hard_count": user_stats.hard_count,
         "current_streak": current_streak,
-        "longest_streak": longest_streak
+        "longest_streak": user_stats.longest_streak
     }
 
-def check_and_unlock_achievements(db: Session, user_id: int):
+def _insert_unlocks(db: Session, user_id: int, achievement_ids: List[int]):
+    """
+    Insert all unlocks, skipping rows a concurrent request already inserted
+    (_user_achievement_uc). Returns the IDs actually inserted: one statement
+    where the database supports ON CONFLICT with RETURNING, one savepoint per
+    row otherwise.
+    """
+    now = datetime.utcnow()
+    rows = [{"user_id": user_id, "achievement_id": aid, "unlocked_at": now} for aid in achievement_ids]
+    dialect = db.get_bind().dialect
+
+    if dialect.name in ("sqlite", "postgresql") and getattr(dialect, "insert_returning", False):
+        if dialect.name == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        stmt = insert(UserAchievement).values(rows).on_conflict_do_nothing(
+            index_elements=["user_id", "achievement_id"]
+        )
+        return {row[0] for row in db.execute(stmt.returning(UserAchievement.achievement_id))}
+
+    # Without RETURNING an ON CONFLICT insert can't say which rows it skipped
+    inserted = set()
+    for row in rows:
+        try:
+            with db.begin_nested():
+                db.add(UserAchievement(**row))
+            inserted.add(row["achievement_id"])
+        except IntegrityError:
+            pass
+    return inserted
+
+def check_and_unlock_achievements(db: Session, user_id: int, event: str = None):
     """
-    Check all achievements and unlock any that meet the criteria.
+    Evaluate achievement rules and unlock any that meet the criteria.
+    With an event ("signup", "attempt_created") only the
+    rules that event can affect are evaluated; without one, all of them.
     Returns list of newly unlocked achievements.
     """
-    achievements = db.query(Achievement).all()
-    already_unlocked = {ua.achievement_id for ua in db.query(UserAchievement).filter(
+    catalog = get_achievement_catalog(db)
+    candidates = catalog.by_event.get(event, []) if event else catalog.achievements
+    if not candidates:
+        return []
+
+    already_unlocked = {row.achievement_id for row in db.query(UserAchievement.achievement_id).filter(
         UserAchievement.user_id == user_id
-    ).all()}
-    
-    stats = calculate_user_stats(db, user_id)
-    newly_unlocked = []
-    
-    for achievement in achievements:
-        if achievement.id in already_unlocked:
-            continue
-        
-        condition = json.loads(achievement.unlock_condition) if isinstance(achievement.unlock_condition, str) else achievement.unlock_condition
-        should_unlock = False
-        
-        if condition["type"] == "login":
-            should_unlock = True  # User exists, so they've logged in
-        elif condition["type"] == "total_attempts":
-            should_unlock = stats["total_attempts"] >= condition["threshold"]
-        elif condition["type"] == "streak":
-            should_unlock = stats["longest_streak"] >= condition["threshold"]
-        elif condition["type"] == "difficulty_count":
-            difficulty = condition["difficulty"].lower()
-            count = stats.get(f"{difficulty}_count", 0)
-            should_unlock = count >= condition["threshold"]
-        
-        if should_unlock:
-            user_achievement = UserAchievement(
-                user_id=user_id,
-                achievement_id=achievement.id
-            )
-            db.add(user_achievement)
-            newly_unlocked.append({
-                "id": achievement.id,
-                "key": achievement.key,
-                "title": achievement.title,
-                "description": achievement.description,
-                "icon_name": achievement.icon_name,
-                "gradient": achievement.gradient
-            })
-    
-    if newly_unlocked:
-        db.commit()
-    
-    return newly_unlocked
+    )}
+    candidates = [a for a in candidates if a.id not in already_unlocked and a.predicate]
+    if not candidates:
+        return []
+
+    stats = calculate_user_stats(db, user_id) if any(a.needs_stats for a in candidates) else None
+    to_unlock = [a for a in candidates if a.predicate(stats)]
+    if not to_unlock:
+        return []
+
+    inserted = _insert_unlocks(db, user_id, [a.id for a in to_unlock])
+    db.commit()
+    return [dict(a.info) for a in to_unlock if a.id in inserted]
 
 def unlock_hello_speaker(db: Session, user_id: int):
     """Unlock the 'Hello Speaker' achievement for a new user."""
-    hello_achievement = db.query(Achievement).filter(Achievement.key == "hello_speaker").first()
-    if not hello_achievement:
-        return None
-    
-    # Check if already unlocked
-    existing = db.query(UserAchievement).filter(
-        UserAchievement.user_id == user_id,
-        UserAchievement.achievement_id == hello_achievement.id
-    ).first()
-    
-    if existing:
-        return None
-    
-    user_achievement = UserAchievement(
-        user_id=user_id,
-        achievement_id=hello_achievement.id
-    )
-    db.add(user_achievement)
-    db.commit()
-    
-    return {
-        "id": hello_achievement.id,
-        "key": hello_achievement.key,
-        "title": hello_achievement.title,
-        "description": hello_achievement.description,
-        "icon_name": hello_achievement.icon_name,
-        "gradient": hello_achievement.gradient
-    }
+    newly_unlocked = check_and_unlock_achievements(db, user_id, event="signup")
+    return next((a for a in newly_unlocked if a["key"] == "hello_speaker"), None)
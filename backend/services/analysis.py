@@ -5,7 +5,9 @@ from fastapi import UploadFile, Depends, HTTPException
 from sqlalchemy.orm import Session
 from database import get_db
 from models import Attempt, User
-from openai import OpenAI
+from pathlib import Path
+from ai_engine.openai_client import get_async_client, call_openai
+from ai_engine.fillers import detect_fillers
 import numpy as np
 from dotenv import load_dotenv
 
@@ -59,16 +61,12 @@ async def analyze_audio(file: UploadFile, topic_id: int, user_id: int | None, db
 
         # 3. STT (OpenAI or Mock)
         transcript = ""
-        api_key = os.getenv("OPENAI_API_KEY")
-        
-        if api_key:
+        if get_async_client():
             try:
-                client = OpenAI(api_key=api_key)
-                with open(temp_filename, "rb") as audio_file:
-                    transcription = client.audio.transcriptions.create(
-                        model="whisper-1", 
-                        file=audio_file
-                    )
+                transcription = await call_openai(lambda client: client.audio.transcriptions.create(
+                    model="whisper-1",
+                    file=Path(temp_filename)
+                ))
                 transcript = transcription.text
             except Exception as e:
                 print(f"OpenAI API error: {e}")
@@ -82,8 +80,7 @@ async def analyze_audio(file: UploadFile, topic_id: int, user_id: int | None, db
         
         # 4. Metrics
         wpm = (word_count / duration) * 60 if duration > 0 else 0
-        filler_words = ["um", "uh", "like", "you know"]
-        filler_count = sum(transcript.lower().count(fw) for fw in filler_words)
+        filler_count = detect_fillers(transcript, lexicon="basic").total
         
         # 5. Scoring (Simple logic)
         clarity_score = min(100, max(0, 100 - (filler_count * 5)))
@@ -1,20 +1,86 @@
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
 from models import Attempt, User, Topic
+from services import leaderboard
+from services.achievements import record_attempt_stats, refresh_user_stats
+from pagination import keyset_page, page_result, DEFAULT_PAGE_SIZE
 
-def get_all_attempts(db: Session, skip: int = 0, limit: int = 100):
-    """Get all attempts with user and topic information."""
-    return db.query(Attempt).options(joinedload(Attempt.topic)).offset(skip).limit(limit).all()
+def get_all_attempts(db: Session, cursor: str = None, limit: int = DEFAULT_PAGE_SIZE):
+    """One page of attempts with topic information, newest first."""
+    query = select(Attempt).options(selectinload(Attempt.topic).selectinload(Topic.category))
+    rows = db.execute(keyset_page(query, Attempt, cursor, limit)).scalars().all()
+    return page_result(rows, limit)
 
 def get_attempts_by_user(db: Session, user_id: int):
     """Get all attempts for a specific user."""
     return db.query(Attempt).options(joinedload(Attempt.topic)).filter(Attempt.user_id == user_id).all()
 
+async def get_attempts_by_user_async(db: AsyncSession, user_id: int, cursor: str = None, limit: int = DEFAULT_PAGE_SIZE):
+    """
+    One page of a user's attempts, newest first, with topics and their
+    categories eagerly loaded (async sessions can't lazy-load).
+    """
+    query = select(Attempt).options(
+        selectinload(Attempt.topic).selectinload(Topic.category)
+    ).where(Attempt.user_id == user_id)
+    rows = (await db.execute(keyset_page(query, Attempt, cursor, limit))).scalars().all()
+    return page_result(rows, limit)
+
+async def get_attempt_summaries_by_user_async(db: AsyncSession, user_id: int, cursor: str = None, limit: int = DEFAULT_PAGE_SIZE):
+    """
+    One page of a user's attempts with only the columns the history list
+    shows; transcript and feedback_json are never read.
+    """
+    query = select(
+        Attempt.id,
+        Attempt.topic_id,
+        Attempt.score,
+        Attempt.wpm,
+        Attempt.filler_count,
+        Attempt.created_at,
+        Topic.title.label("topic_title"),
+        Topic.difficulty.label("topic_difficulty")
+    ).outerjoin(Topic, Topic.id == Attempt.topic_id).where(Attempt.user_id == user_id)
+    rows = (await db.execute(keyset_page(query, Attempt, cursor, limit))).all()
+    page = page_result(rows, limit)
+    # Plain dicts: the response models validate mappings, not Row objects
+    page["items"] = [dict(row._mapping) for row in page["items"]]
+    return page
+
+async def get_attempt_for_user_async(db: AsyncSession, user_id: int, attempt_id: int):
+    """A single attempt with all its fields, if it belongs to the user."""
+    query = select(Attempt).options(
+        selectinload(Attempt.topic).selectinload(Topic.category)
+    ).where(Attempt.id == attempt_id, Attempt.user_id == user_id)
+    return (await db.execute(query)).scalars().first()
+
+def create_attempt(db: Session, **fields):
+    """
+    Insert an attempt and update the leaderboard read models and the user's
+    stats row in the same transaction.
+    """
+    attempt = Attempt(**fields)
+    db.add(attempt)
+    db.flush()
+    leaderboard.record_attempt(db, attempt)
+    record_attempt_stats(db, attempt)
+    db.commit()
+    leaderboard.invalidate_leaderboard_cache()
+    db.refresh(attempt)
+    return attempt
+
 def delete_attempt(db: Session, attempt_id: int):
     """Delete an attempt."""
     attempt = db.query(Attempt).filter(Attempt.id == attempt_id).first()
     if not attempt:
         return None
     
+    leaderboard.remove_attempt(db, attempt)
     db.delete(attempt)
+    db.flush()
+    if attempt.user_id:
+        refresh_user_stats(db, attempt.user_id)
     db.commit()
+    leaderboard.invalidate_leaderboard_cache()
     return True
\ No newline at end of file
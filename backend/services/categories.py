@@ -1,4 +1,6 @@
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from models import Category
 from schemas import CategoryCreate, CategoryUpdate
 
@@ -6,6 +8,10 @@ def get_all_categories(db: Session):
     """Get all categories."""
     return db.query(Category).order_by(Category.name).all()
 
+async def get_all_categories_async(db: AsyncSession):
+    """get_all_categories on an AsyncSession."""
+    return (await db.execute(select(Category).order_by(Category.name))).scalars().all()
+
 def get_category_by_id(db: Session, category_id: int):
     """Get a category by ID."""
     return db.query(Category).filter(Category.id == category_id).first()
@@ -1,4 +1,6 @@
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from pagination import keyset_page, page_result, DEFAULT_PAGE_SIZE
 from models import ContactMessage
 from datetime import datetime
 
@@ -15,5 +17,7 @@ def create_contact_message(db: Session, name: str, email: str, subject: str, mes
     db.refresh(contact)
     return contact
 
-def get_all_contact_messages(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(ContactMessage).offset(skip).limit(limit).all()
+def get_all_contact_messages(db: Session, cursor: str = None, limit: int = DEFAULT_PAGE_SIZE):
+    """One page of contact messages, newest first."""
+    rows = db.execute(keyset_page(select(ContactMessage), ContactMessage, cursor, limit)).scalars().all()
+    return page_result(rows, limit)
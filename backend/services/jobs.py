@@ -0,0 +1,189 @@
+"""
+Service layer for background analysis jobs.
+
+POST /analyze/jobs stores the recording and a queued row; standalone workers
+(worker.py) lease rows with a compare-and-set UPDATE so any number of worker
+processes, on any machine sharing the database and uploads volume, can run
+jobs without double-processing. The running worker renews its lease every
+JOB_HEARTBEAT_SECONDS, and every later write (saving the attempt, completing
+or failing the job) is conditional on still holding it, so a worker whose
+lease lapsed and was taken over can't write a second result.
+"""
+import os
+import uuid
+import asyncio
+from datetime import datetime, timedelta
+from sqlalchemy import update, or_, and_
+from sqlalchemy.orm import Session
+from models import AnalysisJob
+
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "300"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", str(JOB_LEASE_SECONDS / 3)))
+
+class LeaseLost(RuntimeError):
+    """The job was leased by another worker after this one's lease lapsed."""
+
+def _leasable(now: datetime):
+    """Queued jobs, or running jobs whose worker let the lease lapse."""
+    return or_(
+        AnalysisJob.status == "queued",
+        and_(AnalysisJob.status == "running", AnalysisJob.lease_expires_at < now)
+    )
+
+def create_job(db: Session, job_id: str, topic_id: int, user_id: int, audio_path: str, audio_sha256: str = None, audio_size: int = None):
+    """Create a queued analysis job for a staged recording."""
+    job = AnalysisJob(
+        id=job_id,
+        status="queued",
+        topic_id=topic_id,
+        user_id=user_id,
+        audio_path=audio_path,
+        audio_sha256=audio_sha256,
+        audio_size=audio_size
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+def new_job_id() -> str:
+    return uuid.uuid4().hex
+
+def get_job(db: Session, job_id: str):
+    """Get a job by ID."""
+    return db.query(AnalysisJob).filter(AnalysisJob.id == job_id).first()
+
+def lease_next_job(db: Session, worker_id: str, lease_seconds: int = JOB_LEASE_SECONDS):
+    """
+    Claim the oldest leasable job for this worker.
+    Returns the job, or None when the queue is empty.
+    """
+    for _ in range(5):
+        now = datetime.utcnow()
+        candidate = db.query(AnalysisJob.id).filter(_leasable(now)).order_by(AnalysisJob.created_at).first()
+        if candidate is None:
+            return None
+
+        # Compare-and-set: only one worker's UPDATE can match the row
+        claimed = db.execute(
+            update(AnalysisJob)
+            .where(AnalysisJob.id == candidate.id, _leasable(now))
+            .values(
+                status="running",
+                lease_owner=worker_id,
+                lease_expires_at=now + timedelta(seconds=lease_seconds),
+                attempts=AnalysisJob.attempts + 1,
+                updated_at=now
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        if claimed == 1:
+            return get_job(db, candidate.id)
+    return None
+
+def _held_by(job_id: str, worker_id: str):
+    return and_(
+        AnalysisJob.id == job_id,
+        AnalysisJob.status == "running",
+        AnalysisJob.lease_owner == worker_id
+    )
+
+def renew_lease(db: Session, job_id: str, worker_id: str, lease_seconds: int = JOB_LEASE_SECONDS) -> bool:
+    """
+    Extend this worker's lease. Returns False if it no longer holds it.
+    Does not commit, so it can guard other writes in the same transaction.
+    """
+    now = datetime.utcnow()
+    renewed = db.execute(
+        update(AnalysisJob)
+        .where(_held_by(job_id, worker_id))
+        .values(lease_expires_at=now + timedelta(seconds=lease_seconds), updated_at=now)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    return renewed == 1
+
+def _finish_job(db: Session, job: AnalysisJob, worker_id: str, **values) -> bool:
+    finished = db.execute(
+        update(AnalysisJob)
+        .where(_held_by(job.id, worker_id))
+        .values(lease_owner=None, lease_expires_at=None, updated_at=datetime.utcnow(), **values)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    db.refresh(job)
+    return finished == 1
+
+def complete_job(db: Session, job: AnalysisJob, worker_id: str, result: dict) -> bool:
+    """Mark a job as succeeded and store its result. Returns False if the lease was lost."""
+    return _finish_job(db, job, worker_id, status="succeeded", result=result, error=None)
+
+def fail_job(db: Session, job: AnalysisJob, worker_id: str, error: str) -> bool:
+    """
+    Record a failed run. The job goes back on the queue until it has been
+    tried JOB_MAX_ATTEMPTS times. Returns True if the failure is final (and
+    was recorded by the lease holder).
+    """
+    final = (job.attempts or 0) >= JOB_MAX_ATTEMPTS
+    recorded = _finish_job(db, job, worker_id, status="failed" if final else "queued", error=error)
+    return recorded and final
+
+def _renew_in_own_session(job_id: str, worker_id: str) -> bool:
+    from database import SessionLocal
+    db = SessionLocal()
+    try:
+        renewed = renew_lease(db, job_id, worker_id)
+        db.commit()
+        return renewed
+    finally:
+        db.close()
+
+async def _heartbeat(job_id: str, worker_id: str):
+    """Keeps the lease alive while the job runs; stops once it's been lost."""
+    while True:
+        await asyncio.sleep(JOB_HEARTBEAT_SECONDS)
+        try:
+            if not await asyncio.to_thread(_renew_in_own_session, job_id, worker_id):
+                print(f"Lost the lease on job {job_id}")
+                return
+        except Exception as e:
+            print(f"Lease renewal for job {job_id} failed: {e}")
+
+async def run_job(db: Session, job: AnalysisJob):
+    """Run the analysis pipeline for a leased job and record the outcome."""
+    from ai_engine.pipeline import analyze_recording
+    from ai_engine.storage import IngestedAudio, discard
+    from ai_engine.transcode import transcode_attempt_in_background
+    from services.achievements import check_and_unlock_achievements
+
+    worker_id = job.lease_owner
+
+    def guard_save(db: Session):
+        # Runs in the attempt's transaction, before the recording is moved
+        # out of the job area: only the current lease holder may save
+        if not renew_lease(db, job.id, worker_id):
+            raise LeaseLost(f"Lease on job {job.id} was taken over")
+
+    ingested = IngestedAudio(path=job.audio_path, sha256=job.audio_sha256, size=job.audio_size or 0)
+    heartbeat = asyncio.create_task(_heartbeat(job.id, worker_id))
+    try:
+        result = await analyze_recording(ingested, job.topic_id, job.user_id, db, before_save=guard_save)
+        if "error" in result:
+            raise RuntimeError(result["error"])
+        if job.user_id:
+            result["newly_unlocked_achievements"] = check_and_unlock_achievements(db, job.user_id, event="attempt_created")
+    except Exception as e:
+        db.rollback()
+        # The recording belongs to whoever holds the lease now
+        if fail_job(db, job, worker_id, str(e)):
+            discard(ingested)
+        return job
+    finally:
+        heartbeat.cancel()
+
+    if complete_job(db, job, worker_id, result):
+        discard(ingested)
+    if result.get("id"):
+        await asyncio.to_thread(transcode_attempt_in_background, result["id"])
+    return job
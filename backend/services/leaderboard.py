@@ -1,23 +1,53 @@
+"""
+Leaderboard read models.
+
+/leaderboard never touches the attempts table: "top" reads the bounded
+leaderboard_top table and "average" reads per-user running totals. Both are
+updated in the same transaction as the attempt insert/delete (see
+services/attempts.py); rebuild_leaderboard() recomputes them from scratch
+for backfills (python rebuild_leaderboard.py).
+
+On top of that, serialized responses are cached per type for a short TTL
+and dropped explicitly after any write that changes what they show.
+"""
+import os
+import json
 from sqlalchemy.orm import Session
-from models import Attempt, User, Topic
-from sqlalchemy import desc, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from models import Attempt, User, Topic, LeaderboardEntry, UserScoreSummary
+from sqlalchemy import select, desc, asc, func, cast, Float
+from cache import LRUCache
+from http_cache import strong_etag
 
-def get_leaderboard(db: Session, limit: int = 10, leaderboard_type: str = "top"):
-    """
-    Returns leaderboard data based on type:
-    - "top": Top individual attempts by score.
-    - "average": Top users by average score.
-    """
-    leaderboard_data = []
+# Attempts kept in leaderboard_top; reads may ask for at most this many
+LEADERBOARD_TOP_CAPACITY = int(os.getenv("LEADERBOARD_TOP_CAPACITY", "100"))
 
+# Serialized /leaderboard bodies and their ETags, per leaderboard type
+_response_cache = LRUCache(maxsize=8, ttl=float(os.getenv("LEADERBOARD_CACHE_TTL", "30")))
+
+def _leaderboard_query(leaderboard_type: str, limit: int):
+    limit = min(limit, LEADERBOARD_TOP_CAPACITY)
     if leaderboard_type == "average":
-        # Aggregate by user to get average score
-        results = db.query(
+        return select(
             User.username,
-            func.avg(Attempt.score).label("average_score"),
-            func.count(Attempt.id).label("attempt_count")
-        ).join(Attempt).group_by(User.id).order_by(desc("average_score")).limit(limit).all()
+            UserScoreSummary.average_score,
+            UserScoreSummary.attempt_count
+        ).join(User, User.id == UserScoreSummary.user_id).where(
+            UserScoreSummary.average_score.isnot(None)
+        ).order_by(desc(UserScoreSummary.average_score), asc(UserScoreSummary.user_id)).limit(limit)
+
+    return select(
+        LeaderboardEntry.score,
+        LeaderboardEntry.created_at,
+        User.username,
+        Topic.title
+    ).join(User, User.id == LeaderboardEntry.user_id).outerjoin(
+        Topic, Topic.id == LeaderboardEntry.topic_id
+    ).order_by(desc(LeaderboardEntry.score), asc(LeaderboardEntry.attempt_id)).limit(limit)
 
+def _leaderboard_rows(results, leaderboard_type: str):
+    leaderboard_data = []
+    if leaderboard_type == "average":
         for result in results:
             leaderboard_data.append({
                 "rank": 0, # To be filled
@@ -29,19 +59,175 @@ def get_leaderboard(db: Session, limit: int = 10, leaderboard_type: str = "top")
             })
 
     else: # Default to "top"
-        results = db.query(Attempt).order_by(desc(Attempt.score)).limit(limit).all()
-        
-        for attempt in results:
+        for result in results:
             leaderboard_data.append({
                 "rank": 0, # To be filled
-                "user": attempt.user.username,
-                "topic": attempt.topic.title,
-                "score": attempt.score,
-                "date": attempt.created_at.strftime("%Y-%m-%d")
+                "user": result.username,
+                "topic": result.title or "Unknown Topic",
+                "score": result.score,
+                "date": result.created_at.strftime("%Y-%m-%d") if result.created_at else "N/A"
             })
-    
+
     # Add ranks
     for i, item in enumerate(leaderboard_data):
         item["rank"] = i + 1
-        
+
     return leaderboard_data
+
+def get_leaderboard(db: Session, limit: int = 10, leaderboard_type: str = "top"):
+    """
+    Returns leaderboard data based on type:
+    - "top": Top individual attempts by score.
+    - "average": Top users by average score.
+    """
+    results = db.execute(_leaderboard_query(leaderboard_type, limit)).all()
+    return _leaderboard_rows(results, leaderboard_type)
+
+async def get_leaderboard_async(db: AsyncSession, limit: int = 10, leaderboard_type: str = "top"):
+    """get_leaderboard on an AsyncSession."""
+    results = (await db.execute(_leaderboard_query(leaderboard_type, limit))).all()
+    return _leaderboard_rows(results, leaderboard_type)
+
+def _cache_response(leaderboard_type: str, data):
+    body = json.dumps(data, separators=(",", ":")).encode("utf-8")
+    cached = (body, strong_etag(body))
+    _response_cache.set(leaderboard_type, cached)
+    return cached
+
+def get_leaderboard_response(db: Session, leaderboard_type: str = "top"):
+    """
+    Returns (JSON body bytes, strong ETag) for /leaderboard, from the
+    response cache when possible.
+    """
+    leaderboard_type = "average" if leaderboard_type == "average" else "top"
+    cached = _response_cache.get(leaderboard_type)
+    if cached is None:
+        cached = _cache_response(leaderboard_type, get_leaderboard(db, leaderboard_type=leaderboard_type))
+    return cached
+
+async def get_leaderboard_response_async(db: AsyncSession, leaderboard_type: str = "top"):
+    """get_leaderboard_response on an AsyncSession."""
+    leaderboard_type = "average" if leaderboard_type == "average" else "top"
+    cached = _response_cache.get(leaderboard_type)
+    if cached is None:
+        cached = _cache_response(leaderboard_type, await get_leaderboard_async(db, leaderboard_type=leaderboard_type))
+    return cached
+
+def invalidate_leaderboard_cache():
+    """Call after committing a change to attempts, users or topic titles."""
+    _response_cache.clear()
+
+def _adjust_user_scores(db: Session, user_id: int, score, direction: int):
+    """Adds (direction=1) or removes (direction=-1) one attempt from a user's totals."""
+    scored = 1 if score is not None else 0
+    score = score or 0
+    new_scored = UserScoreSummary.scored_count + direction * scored
+    new_sum = UserScoreSummary.score_sum + direction * score
+    updated = db.query(UserScoreSummary).filter(UserScoreSummary.user_id == user_id).update({
+        UserScoreSummary.attempt_count: UserScoreSummary.attempt_count + direction,
+        UserScoreSummary.scored_count: new_scored,
+        UserScoreSummary.score_sum: new_sum,
+        # SET expressions see the old row, so this averages the new totals
+        UserScoreSummary.average_score: cast(new_sum, Float) / func.nullif(new_scored, 0)
+    }, synchronize_session=False)
+    if not updated and direction > 0:
+        db.add(UserScoreSummary(
+            user_id=user_id,
+            attempt_count=1,
+            scored_count=scored,
+            score_sum=score,
+            average_score=float(score) if scored else None
+        ))
+
+def _refill_top(db: Session, exclude_attempt_id: int = None, exclude_user_id: int = None):
+    """
+    Rebuilds leaderboard_top from the highest-scoring attempts (bounded by
+    capacity), skipping rows that are about to be deleted.
+    """
+    db.query(LeaderboardEntry).delete(synchronize_session=False)
+    query = db.query(Attempt.id, Attempt.user_id, Attempt.topic_id, Attempt.score, Attempt.created_at).join(
+        User, User.id == Attempt.user_id
+    ).filter(Attempt.score.isnot(None))
+    if exclude_attempt_id is not None:
+        query = query.filter(Attempt.id != exclude_attempt_id)
+    if exclude_user_id is not None:
+        query = query.filter(Attempt.user_id != exclude_user_id)
+    rows = query.order_by(desc(Attempt.score), asc(Attempt.id)).limit(LEADERBOARD_TOP_CAPACITY).all()
+    db.bulk_insert_mappings(LeaderboardEntry, [
+        {"attempt_id": r.id, "user_id": r.user_id, "topic_id": r.topic_id, "score": r.score, "created_at": r.created_at}
+        for r in rows
+    ])
+
+def record_attempt(db: Session, attempt: Attempt):
+    """
+    Update the leaderboard read models for a newly inserted (flushed) attempt.
+    Does not commit; the caller commits together with the attempt.
+    """
+    _adjust_user_scores(db, attempt.user_id, attempt.score, 1)
+    if attempt.score is None:
+        return
+
+    entries = db.query(LeaderboardEntry.attempt_id, LeaderboardEntry.score).order_by(
+        asc(LeaderboardEntry.score), desc(LeaderboardEntry.attempt_id)
+    )
+    if entries.count() >= LEADERBOARD_TOP_CAPACITY:
+        lowest = entries.first()
+        if attempt.score <= lowest.score:
+            return
+        db.query(LeaderboardEntry).filter(LeaderboardEntry.attempt_id == lowest.attempt_id).delete(synchronize_session=False)
+
+    db.add(LeaderboardEntry(
+        attempt_id=attempt.id,
+        user_id=attempt.user_id,
+        topic_id=attempt.topic_id,
+        score=attempt.score,
+        created_at=attempt.created_at
+    ))
+
+def remove_attempt(db: Session, attempt: Attempt):
+    """
+    Take an attempt that is about to be deleted out of the read models.
+    Does not commit.
+    """
+    _adjust_user_scores(db, attempt.user_id, attempt.score, -1)
+    removed = db.query(LeaderboardEntry).filter(
+        LeaderboardEntry.attempt_id == attempt.id
+    ).delete(synchronize_session=False)
+    if removed:
+        db.flush()
+        # Promote the next best attempt into the freed slot
+        _refill_top(db, exclude_attempt_id=attempt.id)
+
+def remove_user(db: Session, user_id: int):
+    """Drop a deleted user's rows from the read models. Does not commit."""
+    db.query(UserScoreSummary).filter(UserScoreSummary.user_id == user_id).delete(synchronize_session=False)
+    removed = db.query(LeaderboardEntry).filter(
+        LeaderboardEntry.user_id == user_id
+    ).delete(synchronize_session=False)
+    if removed:
+        db.flush()
+        _refill_top(db, exclude_user_id=user_id)
+
+def rebuild_leaderboard(db: Session):
+    """Recompute both read models from the attempts table and commit."""
+    db.query(UserScoreSummary).delete(synchronize_session=False)
+    totals = db.query(
+        Attempt.user_id,
+        func.count(Attempt.id).label("attempt_count"),
+        func.count(Attempt.score).label("scored_count"),
+        func.coalesce(func.sum(Attempt.score), 0).label("score_sum")
+    ).join(User, User.id == Attempt.user_id).group_by(Attempt.user_id).all()
+    db.bulk_insert_mappings(UserScoreSummary, [
+        {
+            "user_id": t.user_id,
+            "attempt_count": t.attempt_count,
+            "scored_count": t.scored_count,
+            "score_sum": t.score_sum,
+            "average_score": t.score_sum / t.scored_count if t.scored_count else None
+        }
+        for t in totals
+    ])
+    _refill_top(db)
+    db.commit()
+    invalidate_leaderboard_cache()
+    return {"users": len(totals), "top_entries": db.query(LeaderboardEntry).count()}
@@ -1,6 +1,9 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
 from models import Topic
 from schemas import TopicCreate
+from services.leaderboard import invalidate_leaderboard_cache
 
 def get_all_topics(db: Session, include_custom: bool = False):
     """Get all topics from database. By default, excludes custom topics."""
@@ -9,6 +12,13 @@ def get_all_topics(db: Session, include_custom: bool = False):
         query = query.filter(Topic.is_custom == False)
     return query.all()
 
+async def get_all_topics_async(db: AsyncSession, include_custom: bool = False):
+    """get_all_topics on an AsyncSession, with categories eagerly loaded."""
+    query = select(Topic).options(selectinload(Topic.category))
+    if not include_custom:
+        query = query.where(Topic.is_custom == False)
+    return (await db.execute(query)).scalars().all()
+
 def get_topic_by_id(db: Session, topic_id: int):
     return db.query(Topic).filter(Topic.id == topic_id).first()
 
@@ -43,6 +53,7 @@ def update_topic(db: Session, topic_id: int, topic_data: TopicCreate):
         topic.difficulty = topic_data.difficulty
         topic.description = topic_data.description
         db.commit()
+        invalidate_leaderboard_cache()
         db.refresh(topic)
         return topic
     return None
@@ -52,5 +63,6 @@ def delete_topic(db: Session, topic_id: int):
     if topic:
         db.delete(topic)
         db.commit()
+        invalidate_leaderboard_cache()
         return True
     return False
@@ -1,10 +1,15 @@
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from models import User
+from pagination import keyset_page, page_result, DEFAULT_PAGE_SIZE
+from models import User, UserStats
 from schemas import UserUpdate
+from services.leaderboard import remove_user, invalidate_leaderboard_cache
+from principals import invalidate_user_principal
 
-def get_all_users(db: Session, skip: int = 0, limit: int = 100):
-    """Get all users with pagination."""
-    return db.query(User).offset(skip).limit(limit).all()
+def get_all_users(db: Session, cursor: str = None, limit: int = DEFAULT_PAGE_SIZE):
+    """One page of users, newest first."""
+    rows = db.execute(keyset_page(select(User), User, cursor, limit)).scalars().all()
+    return page_result(rows, limit)
 
 def get_user_by_id(db: Session, user_id: int):
     """Get a user by ID."""
@@ -22,13 +27,16 @@ def update_user(db: Session, user_id: int, user_update: UserUpdate):
     if 'password' in update_data:
         password = update_data.pop('password')
         if password:
-            from auth import get_password_hash
-            db_user.hashed_password = get_password_hash(password)
+            from auth import get_password_hash, password_hashing
+            db_user.hashed_password = password_hashing.run_blocking(get_password_hash, password)
             
     for key, value in update_data.items():
         setattr(db_user, key, value)
     
     db.commit()
+    invalidate_user_principal(user_id)
+    if 'username' in update_data:
+        invalidate_leaderboard_cache()
     db.refresh(db_user)
     return db_user
 
@@ -38,8 +46,12 @@ def delete_user(db: Session, user_id: int):
     if not db_user:
         return None
     
+    remove_user(db, user_id)
+    db.query(UserStats).filter(UserStats.user_id == user_id).delete(synchronize_session=False)
     db.delete(db_user)
     db.commit()
+    invalidate_user_principal(user_id)
+    invalidate_leaderboard_cache()
     return True
 
 def toggle_admin_status(db: Session, user_id: int):
@@ -50,5 +62,6 @@ def toggle_admin_status(db: Session, user_id: int):
     
     db_user.is_superadmin = not db_user.is_superadmin
     db.commit()
+    invalidate_user_principal(user_id)
     db.refresh(db_user)
     return db_user
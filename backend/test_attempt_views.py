@@ -0,0 +1,92 @@
+"""
+API tests for the attempt history views.
+
+Runs /users/me/attempts against a throwaway SQLite file through the real
+async session path, with the database and current-user dependencies
+overridden, so response validation is exercised end to end.
+
+    python -m pytest test_attempt_views.py
+"""
+import asyncio
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from database import make_engine, make_async_engine, get_async_db
+from dependencies import get_current_user_async
+from main import app
+from models import Base, User, Topic, Attempt
+from principals import UserPrincipal
+
+ATTEMPTS = 5
+
+@pytest.fixture(scope="module")
+def client():
+    directory = tempfile.mkdtemp()
+    url = f"sqlite:///{os.path.join(directory, 'views.db')}"
+    engine = make_engine(url)
+    Base.metadata.create_all(bind=engine)
+    start = datetime(2025, 1, 1)
+    db = sessionmaker(bind=engine)()
+    user = User(username="viewer", email="viewer@example.com", created_at=start)
+    topic = Topic(title="Elevator pitch", difficulty="Hard")
+    db.add_all([user, topic])
+    db.flush()
+    db.add_all([
+        Attempt(
+            user_id=user.id, topic_id=topic.id, transcript="hello there",
+            score=60 + i, wpm=120.0, filler_count=i, created_at=start + timedelta(days=i)
+        )
+        for i in range(ATTEMPTS)
+    ])
+    db.commit()
+    principal = UserPrincipal.from_user(user)
+    db.close()
+
+    async_engine = make_async_engine(url)
+    AsyncSessionLocal = sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def override_async_db():
+        async with AsyncSessionLocal() as session:
+            yield session
+
+    app.dependency_overrides[get_async_db] = override_async_db
+    app.dependency_overrides[get_current_user_async] = lambda: principal
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    asyncio.run(async_engine.dispose())
+    engine.dispose()
+
+def test_summary_view(client):
+    response = client.get("/users/me/attempts", params={"view": "summary", "limit": 2})
+    assert response.status_code == 200, response.text
+    page = response.json()
+    assert [item["score"] for item in page["items"]] == [64, 63]
+    assert page["items"][0]["topic_title"] == "Elevator pitch"
+    assert page["items"][0]["topic_difficulty"] == "Hard"
+    assert "transcript" not in page["items"][0]
+    assert page["next_cursor"]
+
+def test_summary_view_follows_cursor(client):
+    seen = []
+    params = {"view": "summary", "limit": 2}
+    while True:
+        page = client.get("/users/me/attempts", params=params).json()
+        seen.extend(item["id"] for item in page["items"])
+        if not page["next_cursor"]:
+            break
+        params["cursor"] = page["next_cursor"]
+    assert len(seen) == len(set(seen)) == ATTEMPTS
+
+def test_full_view(client):
+    response = client.get("/users/me/attempts", params={"limit": 2})
+    assert response.status_code == 200, response.text
+    assert response.json()["items"][0]["transcript"] == "hello there"
+
+def test_unknown_view(client):
+    assert client.get("/users/me/attempts", params={"view": "compact"}).status_code == 400
@@ -0,0 +1,226 @@
+"""
+Query-plan regression tests for the service layer.
+
+Seeds an in-memory SQLite database with a production-sized dataset, captures
+every statement a service function emits and runs EXPLAIN QUERY PLAN on it.
+A full scan of one of the large tables fails the test, so a dropped index or
+a query rewritten into an unindexable shape is caught before it ships.
+
+    python -m pytest test_query_plans.py
+    python test_query_plans.py
+"""
+import random
+import re
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from models import Base, User, Topic, Category, Attempt, Achievement, UserAchievement
+from services import attempts, achievements, leaderboard, topics, users, contact
+
+try:
+    import pytest
+except ImportError:  # Still runnable as a plain script
+    pytest = None
+
+SEED_USERS = 2000
+SEED_TOPICS = 300
+SEED_ATTEMPTS = 50000
+
+# Tables that grow with usage; a full scan of any of them is a regression.
+# Catalog tables (categories, achievements) and the bounded leaderboard_top
+# stay small and may be scanned.
+LARGE_TABLES = {"users", "topics", "attempts", "user_achievements", "user_stats", "leaderboard_user_scores"}
+
+# "SCAN attempts", "SCAN TABLE attempts" (SQLite < 3.36), "SCAN topics_1" (alias)
+_SCAN_RE = re.compile(r"^SCAN (?:TABLE )?(\w+?)(?:_\d+)?(?: AS \w+)?$")
+
+ACHIEVEMENT_CONDITIONS = [
+    {"type": "login"},
+    {"type": "total_attempts", "threshold": 10},
+    {"type": "total_attempts", "threshold": 50},
+    {"type": "streak", "threshold": 5},
+    {"type": "difficulty_count", "difficulty": "Hard", "threshold": 5},
+]
+
+def seed(db):
+    rng = random.Random(16)
+    start = datetime(2025, 1, 1)
+    conn = db.connection()
+    conn.execute(Category.__table__.insert(), [{"id": i, "name": f"Category {i}"} for i in range(1, 11)])
+    conn.execute(User.__table__.insert(), [
+        {"id": i, "username": f"user{i}", "email": f"user{i}@example.com", "created_at": start}
+        for i in range(1, SEED_USERS + 1)
+    ])
+    conn.execute(Topic.__table__.insert(), [
+        {
+            "id": i,
+            "title": f"Topic {i}",
+            "category_id": rng.randint(1, 10),
+            "difficulty": "Custom" if i % 5 == 0 else rng.choice(["Easy", "Medium", "Hard"]),
+            "is_custom": i % 5 == 0,
+            "created_by": rng.randint(1, SEED_USERS) if i % 5 == 0 else None
+        }
+        for i in range(1, SEED_TOPICS + 1)
+    ])
+    conn.execute(Attempt.__table__.insert(), [
+        {
+            "id": i,
+            "user_id": rng.randint(1, SEED_USERS),
+            "topic_id": rng.randint(1, SEED_TOPICS),
+            "score": None if rng.random() < 0.1 else rng.randint(0, 100),
+            "wpm": 120.0,
+            "filler_count": 0,
+            "created_at": start + timedelta(minutes=rng.randint(0, 60 * 24 * 365))
+        }
+        for i in range(1, SEED_ATTEMPTS + 1)
+    ])
+    conn.execute(Achievement.__table__.insert(), [
+        {
+            "id": i,
+            "key": f"achievement_{i}",
+            "title": f"Achievement {i}",
+            "description": "",
+            "icon_name": "Award",
+            "gradient": "from-blue-500 to-cyan-500",
+            "unlock_condition": condition
+        }
+        for i, condition in enumerate(ACHIEVEMENT_CONDITIONS, start=1)
+    ])
+    # Only the first half of the users have unlocked anything
+    conn.execute(UserAchievement.__table__.insert(), [
+        {"user_id": user_id, "achievement_id": 1, "unlocked_at": start}
+        for user_id in range(1, SEED_USERS // 2 + 1)
+    ])
+    db.commit()
+    leaderboard.rebuild_leaderboard(db)
+    achievements.rebuild_all_user_stats(db)
+    achievements.invalidate_achievement_catalog()
+
+def make_session():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    seed(db)
+    return db
+
+@contextmanager
+def capture_sql(db):
+    """Collects (statement, parameters) for everything executed inside the block."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            statements.append((statement, parameters))
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+def full_scans(db, statements):
+    """Returns (table, plan line, statement) for every full scan of a large table."""
+    conn = db.connection()
+    found = []
+    for statement, parameters in statements:
+        plan = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, tuple(parameters or ())).fetchall()
+        for row in plan:
+            detail = row[-1]
+            match = _SCAN_RE.match(detail)
+            if match and match.group(1) in LARGE_TABLES:
+                found.append((match.group(1), detail, statement))
+    return found
+
+def assert_no_full_scans(db, fn, *args, **kwargs):
+    with capture_sql(db) as statements:
+        fn(db, *args, **kwargs)
+    assert statements, f"{fn.__name__} executed no queries"
+    scans = full_scans(db, statements)
+    assert not scans, f"{fn.__name__} scans large tables:\n" + "\n\n".join(
+        f"{detail}\n{statement}" for _, detail, statement in scans
+    )
+
+if pytest is not None:
+    @pytest.fixture(scope="module")
+    def db():
+        session = make_session()
+        yield session
+        session.close()
+
+def test_get_attempts_by_user(db):
+    assert_no_full_scans(db, attempts.get_attempts_by_user, 42)
+
+def test_get_all_attempts_pages(db):
+    first = attempts.get_all_attempts(db, limit=50)
+    assert first["next_cursor"]
+    assert_no_full_scans(db, attempts.get_all_attempts, cursor=first["next_cursor"], limit=50)
+
+def test_get_all_users_pages(db):
+    first = users.get_all_users(db, limit=50)
+    assert first["next_cursor"]
+    assert_no_full_scans(db, users.get_all_users, cursor=first["next_cursor"], limit=50)
+
+def test_get_all_contact_messages(db):
+    assert_no_full_scans(db, contact.get_all_contact_messages)
+
+def test_create_attempt(db):
+    assert_no_full_scans(db, attempts.create_attempt, user_id=7, topic_id=3, score=99, wpm=130.0, filler_count=1)
+
+def test_delete_top_attempt(db):
+    # Deleting a leaderboard entry refills leaderboard_top from attempts
+    attempt_id = db.query(leaderboard.LeaderboardEntry.attempt_id).order_by(
+        leaderboard.LeaderboardEntry.score.desc()
+    ).first()[0]
+    assert_no_full_scans(db, attempts.delete_attempt, attempt_id)
+
+def test_get_leaderboard_top(db):
+    assert_no_full_scans(db, leaderboard.get_leaderboard, leaderboard_type="top")
+
+def test_get_leaderboard_average(db):
+    assert_no_full_scans(db, leaderboard.get_leaderboard, leaderboard_type="average")
+
+def test_get_all_topics(db):
+    assert_no_full_scans(db, topics.get_all_topics)
+
+def test_delete_topic(db):
+    # Detaching a topic's attempts looks them up by topic_id
+    assert_no_full_scans(db, topics.delete_topic, 17)
+
+def test_calculate_user_stats(db):
+    assert_no_full_scans(db, achievements.calculate_user_stats, 42)
+
+def test_refresh_user_stats(db):
+    assert_no_full_scans(db, achievements.refresh_user_stats, 42)
+    db.rollback()
+
+def test_get_user_achievements(db):
+    assert_no_full_scans(db, achievements.get_user_achievements, 42)
+
+def test_check_and_unlock_achievements(db):
+    assert_no_full_scans(db, achievements.check_and_unlock_achievements, 1500, event="attempt_created")
+
+def test_delete_user(db):
+    # A user from the half without achievements; the rest of their attempts
+    # are detached by user_id
+    assert_no_full_scans(db, users.delete_user, SEED_USERS - 1)
+
+if __name__ == "__main__":
+    session = make_session()
+    failed = 0
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            try:
+                test(session)
+                print(f"✓ {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"✗ {name}\n{e}\n")
+    session.close()
+    raise SystemExit(1 if failed else 0)
@@ -0,0 +1,106 @@
+"""
+Tests for the incrementally maintained user_stats row.
+
+record_attempt_stats() must agree with a full recompute from the attempts
+table (refresh_user_stats) and must not lose increments when several
+attempts for the same user are saved at once.
+
+    python -m pytest test_user_stats.py
+"""
+import os
+import tempfile
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from database import make_engine
+from models import Base, User, Topic, Attempt, UserStats
+from services.achievements import refresh_user_stats, _stats_from_attempts
+from services.attempts import create_attempt
+
+THREADS = 4
+ATTEMPTS_PER_THREAD = 10
+
+@pytest.fixture
+def Session():
+    directory = tempfile.mkdtemp()
+    engine = make_engine(f"sqlite:///{os.path.join(directory, 'stats.db')}")
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = factory()
+    db.add(User(id=1, username="streaker", email="streaker@example.com"))
+    db.add_all([
+        Topic(id=1, title="Easy one", difficulty="Easy"),
+        Topic(id=2, title="Hard one", difficulty="Hard"),
+        Topic(id=3, title="Own topic", difficulty="Custom", is_custom=True)
+    ])
+    db.commit()
+    db.close()
+    yield factory
+    engine.dispose()
+
+def stored_stats(db):
+    row = db.query(UserStats).filter(UserStats.user_id == 1).one()
+    return {key: getattr(row, key) for key in _stats_from_attempts([])}
+
+def recomputed_stats(db):
+    rows = db.query(Attempt.created_at, Topic.difficulty).outerjoin(
+        Topic, Topic.id == Attempt.topic_id
+    ).filter(Attempt.user_id == 1).all()
+    return _stats_from_attempts(rows)
+
+def test_incremental_matches_recompute(Session):
+    start = datetime(2025, 3, 1, 9)
+    # Consecutive days, a same-day repeat, a gap, then a late-arriving
+    # attempt dated before the last one
+    offsets = [0, 1, 1, 2, 5, 6, 7, 8, 3]
+    db = Session()
+    for i, offset in enumerate(offsets):
+        create_attempt(db, user_id=1, topic_id=i % 3 + 1, score=50, created_at=start + timedelta(days=offset))
+        assert stored_stats(db) == recomputed_stats(db), f"after attempt {i}"
+    stats = stored_stats(db)
+    assert stats["total_attempts"] == len(offsets)
+    assert stats["current_streak"] == 4
+    assert stats["longest_streak"] == 4
+    db.close()
+
+def test_concurrent_attempts_keep_every_increment(Session):
+    # Seed the row so every thread takes the incremental path
+    db = Session()
+    refresh_user_stats(db, 1)
+    db.commit()
+    db.close()
+
+    start = datetime(2025, 3, 1, 9)
+    errors = []
+    barrier = threading.Barrier(THREADS)
+
+    def submit(thread_index):
+        session = Session()
+        try:
+            barrier.wait()
+            for i in range(ATTEMPTS_PER_THREAD):
+                create_attempt(
+                    session, user_id=1, topic_id=2, score=70,
+                    created_at=start + timedelta(days=i, minutes=thread_index)
+                )
+        except Exception as e:
+            errors.append(e)
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=submit, args=(n,)) for n in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    db = Session()
+    stats = stored_stats(db)
+    assert stats["total_attempts"] == THREADS * ATTEMPTS_PER_THREAD
+    assert stats["hard_count"] == THREADS * ATTEMPTS_PER_THREAD
+    assert stats == recomputed_stats(db)
+    db.close()
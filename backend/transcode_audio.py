@@ -0,0 +1,107 @@
+"""
+Backfill: re-encode stored attempt recordings to compact Opus, delete the
+originals they replaced once the grace period is over, and optionally move
+older recordings to the cold tier (AUDIO_COLD_DIR).
+
+New attempts are transcoded in the background as they're saved (or left
+for this script when the API's transcode queue is full); run it once for
+the existing corpus, then periodically (e.g. daily, with --cold-after-days):
+
+    python transcode_audio.py                       # transcode everything
+    python transcode_audio.py --workers 8 --limit 1000
+    python transcode_audio.py --cold-after-days 90  # then archive old files
+    python transcode_audio.py --skip-transcode      # only purge replaced originals
+
+Safe to run while the API and workers are up, and to interrupt and rerun.
+"""
+import argparse
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from database import SessionLocal
+from models import Attempt
+from ai_engine.storage import archive_to_cold, AUDIO_COLD_DIR
+from ai_engine.transcode import (
+    transcode_attempt_in_background, purge_superseded_originals, ffmpeg_available,
+    FFMPEG_PATH, TRANSCODE_SUFFIX, TRANSCODE_GRACE_SECONDS
+)
+
+def pending_attempt_ids(limit: int = None):
+    db = SessionLocal()
+    try:
+        query = db.query(Attempt.id).filter(
+            Attempt.audio_url.isnot(None),
+            ~Attempt.audio_url.like(f"%{TRANSCODE_SUFFIX}")
+        ).order_by(Attempt.id)
+        if limit:
+            query = query.limit(limit)
+        return [row.id for row in query]
+    finally:
+        db.close()
+
+def archivable_filenames(older_than_days: int):
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    db = SessionLocal()
+    try:
+        rows = db.query(Attempt.audio_url).filter(
+            Attempt.audio_url.isnot(None),
+            Attempt.created_at < cutoff
+        )
+        return [row.audio_url for row in rows]
+    finally:
+        db.close()
+
+def transcode_all(workers: int, limit: int = None):
+    attempt_ids = pending_attempt_ids(limit)
+    print(f"Transcoding {len(attempt_ids)} recordings with {workers} workers...")
+    done = 0
+    saved = 0
+    # ffmpeg runs in a subprocess, so threads are enough to use every core
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for result in pool.map(transcode_attempt_in_background, attempt_ids):
+            if result:
+                done += 1
+                saved += result.old_size - result.new_size
+    print(f"✅ Transcoded {done} recordings, saved {saved / (1024 * 1024):.1f} MB.")
+
+def purge_originals(grace_seconds: float):
+    db = SessionLocal()
+    try:
+        removed = purge_superseded_originals(db, grace_seconds)
+    finally:
+        db.close()
+    print(f"✅ Deleted {removed} originals replaced more than {grace_seconds / 3600:g} hours ago.")
+
+def archive_all(workers: int, older_than_days: int):
+    filenames = archivable_filenames(older_than_days)
+    print(f"Archiving recordings older than {older_than_days} days to {AUDIO_COLD_DIR}...")
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        moved = sum(pool.map(archive_to_cold, filenames))
+    print(f"✅ Moved {moved} recordings to the cold tier.")
+
+def main():
+    parser = argparse.ArgumentParser(description="Transcode and archive stored recordings")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Parallel ffmpeg processes")
+    parser.add_argument("--limit", type=int, help="Transcode at most this many recordings")
+    parser.add_argument("--cold-after-days", type=int, help="Move recordings older than this to AUDIO_COLD_DIR")
+    parser.add_argument("--grace-hours", type=float, default=TRANSCODE_GRACE_SECONDS / 3600,
+                        help="Keep replaced originals this long for pages still linking to them")
+    parser.add_argument("--skip-transcode", action="store_true", help="Only purge and archive")
+    args = parser.parse_args()
+
+    if not args.skip_transcode:
+        if not ffmpeg_available():
+            print(f"❌ ffmpeg not found ({FFMPEG_PATH}); set FFMPEG_PATH")
+            return
+        transcode_all(args.workers, args.limit)
+
+    purge_originals(args.grace_hours * 3600)
+
+    if args.cold_after_days is not None:
+        if not AUDIO_COLD_DIR:
+            print("❌ AUDIO_COLD_DIR is not set")
+            return
+        archive_all(args.workers, args.cold_after_days)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Standalone analysis worker.
+
+Leases queued jobs created by POST /analyze/jobs and runs the analysis
+pipeline on them. Run as many of these as needed, on any machine that shares
+the database and the uploads volume:
+
+    python worker.py              # poll forever
+    python worker.py --once       # drain the queue and exit
+"""
+import argparse
+import asyncio
+import os
+import socket
+from database import SessionLocal, engine
+from models import Base
+from services.jobs import lease_next_job, run_job
+from ai_engine.executor import warm_pool, shutdown_pool
+
+async def run_worker(poll_interval: float, once: bool = False):
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    print(f"Analysis worker {worker_id} started")
+    while True:
+        db = SessionLocal()
+        try:
+            job = lease_next_job(db, worker_id)
+            if job is None:
+                if once:
+                    return
+                await asyncio.sleep(poll_interval)
+                continue
+            print(f"Running job {job.id} (attempt {job.attempts})")
+            await run_job(db, job)
+            print(f"Job {job.id} -> {job.status}")
+        finally:
+            db.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Talk2Me analysis worker")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds to wait when the queue is empty")
+    parser.add_argument("--once", action="store_true", help="Exit once the queue is empty")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    warm_pool()
+    try:
+        asyncio.run(run_worker(args.poll_interval, args.once))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        shutdown_pool()
+
+if __name__ == "__main__":
+    main()
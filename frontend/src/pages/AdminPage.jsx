@@ -60,10 +60,10 @@ const AdminPage = ({ user }) => {
             return;
         }
         try {
-            const response = await axios.get(`${API_URL}/admin/users`, {
+            const response = await axios.get(`${API_URL}/admin/users?limit=100`, {
                 headers: { 'Authorization': `Bearer ${user.token}` }
             });
-            setUsers(response.data);
+            setUsers(response.data.items);
         } catch (error) {
             console.error("Failed to fetch users", error);
         }
@@ -75,10 +75,10 @@ const AdminPage = ({ user }) => {
             return;
         }
         try {
-            const response = await axios.get(`${API_URL}/admin/attempts`, {
+            const response = await axios.get(`${API_URL}/admin/attempts?limit=100`, {
                 headers: { 'Authorization': `Bearer ${user.token}` }
             });
-            setAttempts(response.data);
+            setAttempts(response.data.items);
         } catch (error) {
             console.error("Failed to fetch attempts", error);
         }
@@ -3,6 +3,7 @@ import { useNavigate } from 'react-router-dom';
 import axios from 'axios';
 import { ArrowLeft, Flame, ChevronLeft, ChevronRight, Lock, Award, Trophy, Star, Zap, Target, Crown } from 'lucide-react';
 import SEO from '../components/SEO';
+import { fetchAllPages } from '../utils/pagination';
 
 const iconMap = {
     'Award': Award,
@@ -45,25 +46,25 @@ const InsightsPage = ({ user }) => {
 
     const fetchData = async () => {
         try {
-            // Fetch attempts and achievements in parallel
-            const [attemptsResponse, achievementsResponse] = await Promise.all([
-                axios.get('http://localhost:8000/users/me/attempts', {
-                    headers: { 'Authorization': `Bearer ${user.token}` }
-                }),
-                axios.get('http://localhost:8000/users/me/achievements', {
-                    headers: { 'Authorization': `Bearer ${user.token}` }
-                })
+            // Fetch attempts (every page, for the calendar), stats and achievements in parallel
+            const headers = { 'Authorization': `Bearer ${user.token}` };
+            const [attemptsData, statsResponse, achievementsResponse] = await Promise.all([
+                fetchAllPages('http://localhost:8000/users/me/attempts', { headers, params: { view: 'summary' } }),
+                axios.get('http://localhost:8000/users/me/stats', { headers }),
+                axios.get('http://localhost:8000/users/me/achievements', { headers })
             ]);
 
-            const attemptsData = attemptsResponse.data;
             const achievementsData = achievementsResponse.data;
 
             setAttempts(attemptsData);
-            const streaks = calculateStreaks(attemptsData);
-            setStreakData(streaks); // Set streak data here after calculation
-
-            // Calculate user stats for progress
-            const stats = calculateUserStats(attemptsData, streaks);
+            // Counts and streaks come from the server-side stats, which cover
+            // every attempt; the attempts only mark active days on the calendar
+            const stats = toUserStats(statsResponse.data);
+            setStreakData({
+                current: stats.currentStreak,
+                longest: stats.longestStreak,
+                activeDays: activeDaysOf(attemptsData)
+            });
 
             // Map achievements from backend with progress calculation
             const mappedAchievements = achievementsData.map(ach => {
@@ -78,7 +79,7 @@ const InsightsPage = ({ user }) => {
                     } else if (condition.type === 'streak') {
                         progress = Math.min((stats.longestStreak / condition.threshold) * 100, 100);
                     } else if (condition.type === 'difficulty_count') {
-                        const count = stats[`${condition.difficulty}Count`] || 0;
+                        const count = stats[`${condition.difficulty.toLowerCase()}Count`] || 0;
                         progress = Math.min((count / condition.threshold) * 100, 100);
                     }
                 }
@@ -106,91 +107,18 @@ const InsightsPage = ({ user }) => {
         }
     };
 
-    const calculateUserStats = (attemptsData, streaks) => {
-        const easyCount = attemptsData.filter(a => a.topic?.difficulty?.toLowerCase() === 'easy').length;
-        const mediumCount = attemptsData.filter(a => a.topic?.difficulty?.toLowerCase() === 'medium').length;
-        const hardCount = attemptsData.filter(a => a.topic?.difficulty?.toLowerCase() === 'hard').length;
-
-        return {
-            totalAttempts: attemptsData.length,
-            easyCount,
-            mediumCount,
-            hardCount,
-            currentStreak: streaks.current,
-            longestStreak: streaks.longest
-        };
-    };
-
-    const calculateStreaks = (data) => {
-        if (!data.length) {
-            const emptyStreaks = { current: 0, longest: 0, activeDays: new Set() };
-            return emptyStreaks;
-        }
-
-        const sortedDates = data
-            .map(a => new Date(a.created_at).setHours(0, 0, 0, 0))
-            .sort((a, b) => a - b);
-
-        const uniqueDates = [...new Set(sortedDates)];
-        const activeDaysSet = new Set(uniqueDates.map(d => new Date(d).toDateString()));
-
-        let current = 0;
-        let longest = 0;
-
-        // Check current streak (working backwards from today)
-        const today = new Date().setHours(0, 0, 0, 0);
-        const yesterday = new Date(today);
-        yesterday.setDate(yesterday.getDate() - 1);
-
-        if (activeDaysSet.has(new Date(today).toDateString())) {
-            current = 1;
-            let checkDate = new Date(today);
-            while (true) {
-                checkDate.setDate(checkDate.getDate() - 1);
-                if (activeDaysSet.has(checkDate.toDateString())) {
-                    current++;
-                } else {
-                    break;
-                }
-            }
-        } else if (activeDaysSet.has(yesterday.toDateString())) {
-            current = 1;
-            let checkDate = new Date(yesterday);
-            while (true) {
-                checkDate.setDate(checkDate.getDate() - 1);
-                if (activeDaysSet.has(checkDate.toDateString())) {
-                    current++;
-                } else {
-                    break;
-                }
-            }
-        }
-
-        // Calculate longest streak
-        let streak = 0;
-        for (let i = 0; i < uniqueDates.length; i++) {
-            if (i > 0) {
-                const diff = (uniqueDates[i] - uniqueDates[i - 1]) / (1000 * 60 * 60 * 24);
-                if (diff === 1) {
-                    streak++;
-                } else {
-                    streak = 1;
-                }
-            } else {
-                streak = 1;
-            }
-            longest = Math.max(longest, streak);
-        }
-
-        const streaks = {
-            current,
-            longest,
-            activeDays: activeDaysSet
-        };
-
-        setStreakData(streaks);
-        return streaks;
-    };
+    const toUserStats = (data) => ({
+        totalAttempts: data.total_attempts,
+        easyCount: data.easy_count,
+        mediumCount: data.medium_count,
+        hardCount: data.hard_count,
+        currentStreak: data.current_streak,
+        longestStreak: data.longest_streak
+    });
+
+    const activeDaysOf = (data) => new Set(
+        data.map(a => new Date(a.created_at).toDateString())
+    );
 
     const getDaysInMonth = (date) => {
         const year = date.getFullYear();
@@ -9,6 +9,7 @@ import SEO from '../components/SEO';
 import jsPDF from 'jspdf';
 import html2canvas from 'html2canvas';
 import { getAvatarPath } from '../utils/avatars';
+import { fetchAllPages } from '../utils/pagination';
 
 const ProfilePage = ({ user, onUpdate }) => {
     const navigate = useNavigate();
@@ -18,14 +19,15 @@ const ProfilePage = ({ user, onUpdate }) => {
         email: '',
         password: ''
     });
+    // Summary rows (score, WPM, date, topic) of every attempt, for the charts
     const [attempts, setAttempts] = useState([]);
+    // Full rows of the most recent attempts, for the history table and reports
+    const [recentAttempts, setRecentAttempts] = useState([]);
+    const [stats, setStats] = useState(null);
     const [loading, setLoading] = useState(true);
     const [selectedAttempt, setSelectedAttempt] = useState(null);
     const [showReportModal, setShowReportModal] = useState(false);
-    // Pagination state
-    const [currentPage, setCurrentPage] = useState(1);
     const pageSize = 5;
-    const paginatedAttempts = attempts.slice((currentPage - 1) * pageSize, currentPage * pageSize);
 
     useEffect(() => {
         if (user?.token) {
@@ -37,10 +39,18 @@ const ProfilePage = ({ user, onUpdate }) => {
 
     const fetchAttempts = async () => {
         try {
-            const response = await axios.get(`${API_URL}/users/me/attempts`, {
-                headers: { 'Authorization': `Bearer ${user.token}` }
-            });
-            setAttempts(response.data);
+            // Charts and scores use the lightweight summary view of every
+            // attempt; transcripts and feedback are only loaded for the
+            // table's page. The total comes from the server-side stats
+            const headers = { 'Authorization': `Bearer ${user.token}` };
+            const [summaries, recentResponse, statsResponse] = await Promise.all([
+                fetchAllPages(`${API_URL}/users/me/attempts`, { headers, params: { view: 'summary' } }),
+                axios.get(`${API_URL}/users/me/attempts`, { headers, params: { limit: pageSize } }),
+                axios.get(`${API_URL}/users/me/stats`, { headers })
+            ]);
+            setAttempts(summaries);
+            setRecentAttempts(recentResponse.data.items);
+            setStats(statsResponse.data);
             setLoading(false);
         } catch (error) {
             console.error("Failed to fetch attempts", error);
@@ -207,12 +217,24 @@ const ProfilePage = ({ user, onUpdate }) => {
         }
     };
 
-    const exportToCSV = () => {
+    const exportToCSV = async () => {
         if (attempts.length === 0) {
             showAlert('info', 'No data to export.', 'Info');
             return;
         }
 
+        // The export includes transcripts, so full rows are fetched only on request
+        let fullAttempts;
+        try {
+            fullAttempts = await fetchAllPages(`${API_URL}/users/me/attempts`, {
+                headers: { 'Authorization': `Bearer ${user.token}` }
+            });
+        } catch (error) {
+            console.error("Failed to fetch attempts for export", error);
+            showAlert('error', 'Failed to export attempts', 'Error');
+            return;
+        }
+
         const headers = [
             "Date", "Topic", "Score", "WPM", "Filler Words", "Tone", "Clarity", "Content Match Score", "Transcript"
         ];
@@ -220,7 +242,7 @@ const ProfilePage = ({ user, onUpdate }) => {
         const csvRows = [];
         csvRows.push(headers.join(','));
 
-        attempts.forEach(attempt => {
+        fullAttempts.forEach(attempt => {
             const feedback = attempt.feedback_json || {};
             const row = [
                 `"${new Date(attempt.created_at).toLocaleDateString()}"`,
@@ -248,9 +270,9 @@ const ProfilePage = ({ user, onUpdate }) => {
     };
 
     // Calculate Stats
-    const totalAttempts = attempts.length;
-    const avgScore = totalAttempts > 0 ? (attempts.reduce((acc, curr) => acc + curr.score, 0) / totalAttempts).toFixed(1) : 0;
-    const bestScore = totalAttempts > 0 ? Math.max(...attempts.map(a => a.score)).toFixed(1) : 0;
+    const totalAttempts = stats ? stats.total_attempts : attempts.length;
+    const avgScore = attempts.length > 0 ? (attempts.reduce((acc, curr) => acc + curr.score, 0) / attempts.length).toFixed(1) : 0;
+    const bestScore = attempts.length > 0 ? Math.max(...attempts.map(a => a.score)).toFixed(1) : 0;
 
     // Prepare Chart Data (sort by date)
     const chartData = [...attempts].sort((a, b) => new Date(a.created_at) - new Date(b.created_at)).map((a, index) => ({
@@ -264,12 +286,6 @@ const ProfilePage = ({ user, onUpdate }) => {
     // Recent Activity (reverse chronological)
     const recentActivity = [...attempts].sort((a, b) => new Date(b.created_at) - new Date(a.created_at)).slice(0, 5);
 
-    const totalPages = Math.ceil(attempts.length / pageSize);
-
-    const handlePageChange = (pageNumber) => {
-        setCurrentPage(pageNumber);
-    };
-
     if (!user) return null;
 
     return (
@@ -468,7 +484,7 @@ const ProfilePage = ({ user, onUpdate }) => {
                                         </tr>
                                     </thead>
                                     <tbody className="bg-white divide-y divide-gray-200">
-                                        {paginatedAttempts.map((attempt) => (
+                                        {recentAttempts.map((attempt) => (
                                             <tr key={attempt.id} className="hover:bg-gray-50 transition-colors">
                                                 <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-500">
                                                     {new Date(attempt.created_at).toLocaleDateString()}
@@ -17,10 +17,10 @@ const AdminAttempts = ({ user }) => {
             return;
         }
         try {
-            const response = await axios.get(`${API_URL}/admin/attempts`, {
+            const response = await axios.get(`${API_URL}/admin/attempts?limit=100`, {
                 headers: { 'Authorization': `Bearer ${user.token}` }
             });
-            setAttempts(response.data);
+            setAttempts(response.data.items);
         } catch (error) {
             console.error("Failed to fetch attempts", error);
         }
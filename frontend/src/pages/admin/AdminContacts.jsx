@@ -13,10 +13,10 @@ const AdminContacts = ({ user }) => {
 
     const fetchContacts = async () => {
         try {
-            const response = await axios.get(`${API_URL}/admin/contacts`, {
+            const response = await axios.get(`${API_URL}/admin/contacts?limit=100`, {
                 headers: { 'Authorization': `Bearer ${user.token}` }
             });
-            setContacts(response.data);
+            setContacts(response.data.items);
         } catch (error) {
             console.error('Failed to fetch contacts', error);
         } finally {
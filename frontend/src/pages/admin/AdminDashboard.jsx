@@ -27,18 +27,18 @@ const AdminDashboard = ({ user }) => {
             const [topicsRes, categoriesRes, usersRes, attemptsRes] = await Promise.all([
                 axios.get(`${API_URL}/topics`),
                 axios.get(`${API_URL}/categories`),
-                axios.get(`${API_URL}/admin/users`, {
+                axios.get(`${API_URL}/admin/users?limit=100`, {
                     headers: { 'Authorization': `Bearer ${user.token}` }
                 }),
-                axios.get(`${API_URL}/admin/attempts`, {
+                axios.get(`${API_URL}/admin/attempts?limit=100`, {
                     headers: { 'Authorization': `Bearer ${user.token}` }
                 })
             ]);
 
             const topics = topicsRes.data;
             const categories = categoriesRes.data;
-            const users = usersRes.data;
-            const attempts = attemptsRes.data;
+            const users = usersRes.data.items;
+            const attempts = attemptsRes.data.items;
 
             // Calculate average score
             const validScores = attempts.filter(a => a.score !== null && a.score !== undefined);
@@ -22,10 +22,10 @@ const AdminUsers = ({ user }) => {
             return;
         }
         try {
-            const response = await axios.get(`${API_URL}/admin/users`, {
+            const response = await axios.get(`${API_URL}/admin/users?limit=100`, {
                 headers: { 'Authorization': `Bearer ${user.token}` }
             });
-            setUsers(response.data);
+            setUsers(response.data.items);
         } catch (error) {
             console.error("Failed to fetch users", error);
         }
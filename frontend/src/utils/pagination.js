@@ -0,0 +1,18 @@
+import axios from 'axios';
+
+// Fetches every page of a cursor-paginated listing ({ items, next_cursor })
+// and returns the combined items. Use for views that need the whole list;
+// totals and streaks should come from /users/me/stats instead.
+export const fetchAllPages = async (url, config = {}, pageSize = 100) => {
+    const items = [];
+    let cursor = null;
+    do {
+        const response = await axios.get(url, {
+            ...config,
+            params: { ...(config.params || {}), limit: pageSize, ...(cursor ? { cursor } : {}) }
+        });
+        items.push(...response.data.items);
+        cursor = response.data.next_cursor;
+    } while (cursor);
+    return items;
+};